@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Benchmark the stages of extract-lesson-cards.py.
+
+Runs each pipeline stage over the checked-in synthetic lesson PDFs in
+bench/pdfs/ (see make-bench-pdfs.py) and reports, per stage, the best and
+median wall time over --repeat runs plus the peak Python heap during one
+extra traced run. Every stage gets the same inputs the extractor would give
+it, prepared before timing starts, so stages are measured in isolation.
+
+Peak memory comes from tracemalloc, so it covers Python objects only; memory
+MuPDF allocates in C while laying out a page is not included.
+
+Results are printed as a table and, with --output, written as JSON. With
+--compare, stages slower than a saved result file by more than --threshold
+are flagged and the script exits 1.
+
+Usage:
+  python3 bench-extraction.py [--repeat 5] [--output bench/baseline.json]
+  python3 bench-extraction.py --compare bench/baseline.json [--threshold 0.15]
+"""
+
+import argparse
+import copy
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+
+from lesson_text import clean_text, clear_classifier_cache, split_sections
+from script_loader import load_script
+
+BENCH_PDF_DIR = Path("bench/pdfs")
+RESULT_VERSION = 1
+
+
+def prepare_inputs(extractor, pdfs):
+    """Run the pipeline once per PDF, keeping every intermediate a stage takes as input."""
+    lessons = []
+    for pdf_path in pdfs:
+        clear_classifier_cache()
+        dict_lines, plain_text = extractor.extract_text(pdf_path, full_layout=False)
+        cleaned_text = clean_text(plain_text)
+        sections = split_sections(cleaned_text)
+        fmt = extractor.detect_pdf_format(dict_lines)
+        if fmt == 'B':
+            dialogue = extractor.parse_dialogue_format_b(dict_lines)
+        else:
+            dialogue = extractor.parse_dialogue_format_a(cleaned_text, sections)
+        # The lesson as process_lesson_pdf has it just before post-processing
+        result = {
+            "lessonTitle": "",
+            "vocab": extractor.parse_vocabulary(cleaned_text, sections),
+            "sentences": extractor.parse_sample_sentences(cleaned_text, sections),
+            "dialogue": dialogue,
+        }
+        lessons.append({
+            "pdf_path": pdf_path,
+            "dict_lines": dict_lines,
+            "plain_text": plain_text,
+            "cleaned_text": cleaned_text,
+            "sections": sections,
+            "format": fmt,
+            "result": result,
+        })
+    return lessons
+
+
+def parse_each(parser, key, with_sections=False):
+    """Stage body for a parser: fresh classifier cache per lesson, as in process_lesson_pdf."""
+    def run(lessons):
+        for lesson in lessons:
+            clear_classifier_cache()
+            if with_sections:
+                parser(lesson[key], lesson["sections"])
+            else:
+                parser(lesson[key])
+    return run
+
+
+def build_stages(extractor, lessons):
+    """[(name, setup, run, calls)]: setup() builds untimed per-run input, run(inputs) is timed."""
+    format_a = [l for l in lessons if l["format"] == 'A']
+    format_b = [l for l in lessons if l["format"] == 'B']
+
+    def each(fn, key):
+        return lambda ls: [fn(l[key]) for l in ls]
+
+    def post_process(results):
+        for result in results:
+            extractor.post_process_cards(result)
+
+    # extract_text is the pass process_lesson_pdf makes (dict lines only where
+    # they are read); extract_text_full lays out every page in dict mode too.
+    # post_process_cards edits cards in place, so each run gets its own copy
+    return [
+        ("extract_text", lambda: lessons,
+         each(partial(extractor.extract_text, full_layout=False), "pdf_path"), len(lessons)),
+        ("extract_text_full", lambda: lessons,
+         each(partial(extractor.extract_text, full_layout=True), "pdf_path"), len(lessons)),
+        ("clean_text", lambda: lessons, each(clean_text, "plain_text"), len(lessons)),
+        ("split_sections", lambda: lessons, each(split_sections, "cleaned_text"), len(lessons)),
+        ("detect_pdf_format", lambda: lessons, each(extractor.detect_pdf_format, "dict_lines"), len(lessons)),
+        ("parse_dialogue_format_a", lambda: format_a,
+         parse_each(extractor.parse_dialogue_format_a, "cleaned_text", True), len(format_a)),
+        ("parse_dialogue_format_b", lambda: format_b,
+         parse_each(extractor.parse_dialogue_format_b, "dict_lines"), len(format_b)),
+        ("parse_vocabulary", lambda: lessons,
+         parse_each(extractor.parse_vocabulary, "cleaned_text", True), len(lessons)),
+        ("parse_sample_sentences", lambda: lessons,
+         parse_each(extractor.parse_sample_sentences, "cleaned_text", True), len(lessons)),
+        ("post_process_cards", lambda: [copy.deepcopy(l["result"]) for l in lessons], post_process, len(lessons)),
+    ]
+
+
+def measure(setup, run, repeat):
+    """Wall times of `repeat` runs, then the peak traced heap of one more run."""
+    times = []
+    for _ in range(repeat):
+        inputs = setup()
+        start = time.perf_counter()
+        run(inputs)
+        times.append(time.perf_counter() - start)
+
+    inputs = setup()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        run(inputs)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return times, peak
+
+
+def run_benchmarks(pdfs, repeat):
+    extractor = load_script("extract-lesson-cards.py")
+    lessons = prepare_inputs(extractor, pdfs)
+    stages = {}
+    for name, setup, run, calls in build_stages(extractor, lessons):
+        times, peak = measure(setup, run, repeat)
+        stages[name] = {
+            "calls": calls,
+            "best_s": min(times),
+            "median_s": statistics.median(times),
+            "peak_bytes": peak,
+        }
+    import fitz
+    return {
+        "version": RESULT_VERSION,
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "fixtures": [p.name for p in pdfs],
+        "repeat": repeat,
+        "stages": stages,
+    }
+
+
+def print_results(results):
+    print(f"{'Stage':<26} {'calls':>5} {'best':>10} {'median':>10} {'peak heap':>12}")
+    for name, stage in results["stages"].items():
+        print(f"{name:<26} {stage['calls']:>5} {stage['best_s'] * 1000:>8.2f}ms "
+              f"{stage['median_s'] * 1000:>8.2f}ms {stage['peak_bytes'] / 1024:>9.1f}KiB")
+
+
+def compare_results(results, baseline, threshold, min_delta):
+    """Print best-time changes against a baseline; returns the names of regressed stages."""
+    if baseline.get("fixtures") != results["fixtures"]:
+        print("WARNING: baseline was recorded on a different fixture set")
+
+    regressed = []
+    print(f"\n{'Stage':<26} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stage in results["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if old is None:
+            print(f"{name:<26} {'-':>10} {stage['best_s'] * 1000:>8.2f}ms {'new':>8}")
+            continue
+        old_s, new_s = old["best_s"], stage["best_s"]
+        change = (new_s - old_s) / old_s if old_s else 0.0
+        flag = ""
+        # Sub-noise differences on very fast stages are not regressions
+        if change > threshold and new_s - old_s > min_delta:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<26} {old_s * 1000:>8.2f}ms {new_s * 1000:>8.2f}ms {change:>+7.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lesson PDF extraction stages.")
+    parser.add_argument('--pdfs', type=Path, default=BENCH_PDF_DIR, help="directory of fixture PDFs")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per stage")
+    parser.add_argument('-o', '--output', type=Path, help="write results as JSON to this file")
+    parser.add_argument('--compare', type=Path, metavar='BASELINE',
+                        help="compare against a saved result file; exit 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="relative slowdown of the best time counted as a regression (default: 0.15)")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                        help="ignore slowdowns smaller than this many milliseconds (default: 0.5)")
+    args = parser.parse_args()
+
+    pdfs = sorted(args.pdfs.glob("*.pdf"))
+    if not pdfs:
+        print(f"No fixture PDFs in {args.pdfs} (generate them with make-bench-pdfs.py)")
+        return 1
+
+    results = run_benchmarks(pdfs, args.repeat)
+    print_results(results)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"\nResults: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressed = compare_results(results, baseline, args.threshold, args.min_delta_ms / 1000)
+        if regressed:
+            print(f"\n{len(regressed)} stage(s) regressed: {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
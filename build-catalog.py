@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Build src/data/courses.json and src/data/library.json from the vendor bundle.
+
+Replaces the echo-based catalog generation in sanitize-resources.sh: the
+bundle is walked once (resource_layout.plan_resources), file names are
+slugified in-process and both catalogs are built in memory and written
+with json, so the output is always valid JSON. Levels the bundle does not
+provide, like study-notes, are carried over from the existing
+courses.json, and so are fingerprinted file names and the page index
+of split library PDFs. Both files are written under the course_catalog lock, via a
+temp file and rename.
+
+Usage:
+  python3 build-catalog.py [--vendor /home/cmantra/Learn_Mandarin]
+  python3 build-catalog.py --check     # report what would change, write nothing
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from course_catalog import COURSES_FILE, update_catalog
+from resource_layout import (VENDOR_DIR, build_courses, build_library, logical_path, map_catalog_paths,
+                             plan_resources)
+
+LIBRARY_FILE = Path("src/data/library.json")
+
+
+def load_catalog(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def keep_fingerprints(new, existing):
+    """Carry over the hashed file names fingerprint-resources.py gave existing's paths.
+
+    Keeps a rebuild from flipping every path back to its logical name; the
+    fingerprint stage that follows refreshes any hash whose file changed.
+    """
+    hashed = {}
+
+    def record(path):
+        hashed.setdefault(logical_path(path), path)
+        return path
+
+    map_catalog_paths(existing, record)
+    map_catalog_paths(new, lambda path: hashed.get(path, path))
+    return new
+
+
+def replace_contents(catalog, new):
+    """Swap catalog's contents for new in place; True if they differed."""
+    changed = catalog != new
+    catalog.clear()
+    catalog.update(new)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build courses.json and library.json from the vendor bundle.")
+    parser.add_argument('--vendor', type=Path, default=VENDOR_DIR, help=f"vendor bundle (default: {VENDOR_DIR})")
+    parser.add_argument('--courses', type=Path, default=COURSES_FILE, help=f"courses catalog (default: {COURSES_FILE})")
+    parser.add_argument('--library', type=Path, default=LIBRARY_FILE, help=f"library catalog (default: {LIBRARY_FILE})")
+    parser.add_argument('--check', action='store_true', help="only report whether the catalogs are up to date")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    plan = plan_resources(args.vendor)
+    if not plan.files:
+        print(f"ERROR: nothing found in {args.vendor}")
+        return 1
+
+    changed = []
+    for path, build in ((args.courses, lambda existing: keep_fingerprints(build_courses(plan, existing), existing)),
+                        (args.library, lambda existing: keep_fingerprints(build_library(plan, existing), existing))):
+        if args.check:
+            existing = load_catalog(path)
+            is_changed = build(existing) != existing
+        else:
+            is_changed = update_catalog(lambda catalog: replace_contents(catalog, build(catalog)), path, default={})
+        if is_changed:
+            changed.append(path)
+
+    for level in plan.levels:
+        print(f"  {level['id']}: {len(level['lessons'])} audio lessons, {len(level['materials'])} PDF materials")
+    print(f"  vocab: {len(plan.vocab)} audio files")
+    print(f"  library: {sum(len(c['books']) for c in plan.library)} eBooks")
+    for missing in plan.missing:
+        print(f"  WARNING: Not found: {missing}")
+    verb = "Out of date" if args.check else "Updated"
+    for path in changed:
+        print(f"{verb}: {path}")
+    if not changed:
+        print("Catalogs already up to date")
+    print(f"({len(plan.files)} files, {time.perf_counter() - start:.2f}s)")
+    return 1 if args.check and changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
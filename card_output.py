@@ -0,0 +1,458 @@
+"""
+Output helpers for the card generator scripts.
+
+Cards can be written two ways, chosen with add_output_arguments() /
+card_writer():
+  - monolithic (default): the single {lesson_id: lesson} JSON file in
+    src/data that the app imports (src/stores/courses.js)
+  - per-lesson shards (--shards): one file per lesson, e.g. public/cards/L1-006.json,
+    plus manifest.json listing each lesson's title, card counts and content
+    hash, so the frontend can fetch only the lesson being opened. This
+    becomes the default once the frontend reads shards; until then the
+    monolithic files are what the app and the card tools (CARD_FILES) use
+
+Either can be written pretty-printed (default, indent=2) or with --compact:
+minified JSON with sorted keys and a raw vs minified vs compressed size
+report. Compact shards also get .gz and .br siblings for nginx's
+gzip_static / brotli_static; the monolithic file is bundled by the app
+rather than served, so it gets none.
+
+StreamingCardWriter writes a {lesson_id: lesson} JSON object one lesson at a
+time, so memory stays bounded by a single lesson. The bytes match
+json.dump(cards, f, ensure_ascii=False, indent=2); compact output puts one
+minified lesson per line. Output goes to
+<file>.partial and is renamed over the real file only on success; after a
+crash the partial file holds every lesson written so far and
+read_partial_lessons() can replay them for a resumed run.
+"""
+
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional: without it --compact skips the .br siblings
+    brotli = None
+
+SHARD_DIR = Path("public/cards")
+CARD_FILES = [  # the monolithic card files the card tools read by default
+    Path("src/data/course-cards.json"),
+    Path("src/data/study-notes-cards.json"),
+    Path("src/data/vocab-groups-cards.json"),
+]
+MANIFEST_NAME = "manifest.json"
+CARD_TYPES = ("vocab", "sentences", "dialogue")
+ID_LETTERS = {"vocab": "V", "sentences": "S", "dialogue": "D"}
+JSON_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+READ_CHUNK = 64 * 1024
+
+
+def partial_path(path):
+    """Temp file that a streamed output is written to before the final rename."""
+    path = Path(path)
+    return path.with_name(path.name + ".partial")
+
+
+def default_card_id(lesson_id, card_type, index):
+    """The ID extract-lesson-cards.py gives a lesson's card at index, e.g. L1-006-V03."""
+    return f"{lesson_id}-{ID_LETTERS[card_type]}{index + 1:02d}"
+
+
+def dump_pretty(obj):
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def dump_compact(obj):
+    """Minified JSON with sorted keys, so identical data always gives identical bytes."""
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+
+def dump_lesson_entry(lesson_id, lesson, compact=False):
+    """One '"id": {...}' member, laid out as it appears inside the top-level object."""
+    if compact:
+        return f'{json.dumps(lesson_id, ensure_ascii=False)}:{dump_compact(lesson)}'
+    value = dump_pretty(lesson).replace('\n', '\n  ')
+    return f'  {json.dumps(lesson_id, ensure_ascii=False)}: {value}'
+
+
+def compress_variants(data):
+    """{"gz": bytes, "br": bytes or None (brotli not installed)} for data.
+
+    gzip's mtime is pinned so unchanged data gives byte-identical archives.
+    """
+    return {
+        "gz": gzip.compress(data, compresslevel=9, mtime=0),
+        "br": brotli.compress(data, quality=11) if brotli is not None else None,
+    }
+
+
+def compressed_sizes(path):
+    """Sizes compress_variants() would give path's bytes, without writing anything."""
+    return {suffix: None if variant is None else len(variant)
+            for suffix, variant in compress_variants(Path(path).read_bytes()).items()}
+
+
+def write_compressed_siblings(path):
+    """Write <path>.gz (and <path>.br when brotli is installed); returns their sizes."""
+    sizes = {}
+    for suffix, variant in compress_variants(Path(path).read_bytes()).items():
+        if variant is not None:
+            write_atomic(f"{path}.{suffix}", variant)
+        sizes[suffix] = None if variant is None else len(variant)
+    return sizes
+
+
+def remove_compressed_siblings(path):
+    """Drop .gz/.br files left by an earlier --compact run so nginx never serves stale data."""
+    for suffix in (".gz", ".br"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def print_size_report(rows):
+    """Print raw (pretty) vs minified vs compressed bytes for each compact output file."""
+    def fmt(n):
+        return f"{n:>10,}" if n is not None else f"{'-':>10}"
+
+    print(f"\n{'File':<28} {'raw':>10} {'minified':>10} {'gzip':>10} {'brotli':>10}")
+    totals = {"raw": 0, "min": 0, "gz": 0, "br": 0}
+    for name, raw, minified, sizes in rows:
+        print(f"{name:<28} {fmt(raw)} {fmt(minified)} {fmt(sizes['gz'])} {fmt(sizes['br'])}")
+        totals["raw"] += raw
+        totals["min"] += minified
+        totals["gz"] += sizes["gz"]
+        totals["br"] += sizes["br"] or 0
+    if len(rows) > 1:
+        print(f"{'TOTAL':<28} {fmt(totals['raw'])} {fmt(totals['min'])} {fmt(totals['gz'])} "
+              f"{fmt(totals['br'] if brotli is not None else None)}")
+    if brotli is None:
+        print("(brotli module not installed: .br files skipped)")
+
+
+class StreamingCardWriter:
+    """Stream lessons into a JSON object file, renaming it into place on success.
+
+    Use as a context manager: a clean exit finishes the object and renames
+    the partial file over the target; an exception leaves the partial file
+    (flushed up to the last complete lesson) for --resume.
+    """
+
+    def __init__(self, path, compact=False):
+        self.path = Path(path)
+        self.tmp_path = partial_path(self.path)
+        self.compact = compact
+        self.count = 0
+        self.raw_size = 2  # '{' + '}' of the pretty layout, for the size report
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+        self._file.write('{')
+        return self
+
+    def write(self, lesson_id, lesson):
+        """Append one lesson and flush, so a crash never loses a finished lesson."""
+        sep = ',\n' if self.count else '\n'
+        if self.compact:
+            self.raw_size += len((sep + dump_lesson_entry(lesson_id, lesson)).encode('utf-8'))
+        self._file.write(sep + dump_lesson_entry(lesson_id, lesson, self.compact))
+        self._file.flush()
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._file.close()
+            return False
+        self._file.write('\n}' if self.count else '}')
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+        # The monolithic file is bundled by the app, not served by nginx, so
+        # compressed siblings would only be clutter; report their sizes instead
+        remove_compressed_siblings(self.path)
+        if self.compact:
+            raw = self.raw_size + (1 if self.count else 0)
+            print_size_report([(self.path.name, raw, self.path.stat().st_size, compressed_sizes(self.path))])
+        return False
+
+
+def read_partial_lessons(path):
+    """Yield (lesson_id, lesson) for every complete lesson in a partial output file.
+
+    Relies on the StreamingCardWriter layouts. Pretty: each lesson starts on
+    a line indented by exactly two spaces and ends with a line that is just
+    '  }' (plus a comma if another lesson followed). Compact: each lesson is
+    one unindented line. A lesson cut off mid-write is dropped.
+    """
+    entry = []
+    # A crash can cut the file inside a multi-byte character; that only ever
+    # affects the unfinished last lesson, which is dropped anyway
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not entry:
+                if line.startswith('"'):
+                    try:
+                        yield next(iter(json.loads('{' + line.rstrip(',') + '}').items()))
+                    except ValueError:
+                        pass  # truncated last line
+                elif line.startswith('  "'):
+                    entry.append(line)
+                continue
+            if line in ('  }', '  },'):
+                entry.append('  }')
+                yield next(iter(json.loads('{' + '\n'.join(entry) + '}').items()))
+                entry = []
+            else:
+                entry.append(line)
+
+
+def claim_partial_output(path):
+    """Move an interrupted run's partial output aside so it can be replayed.
+
+    Returns the path to read finished lessons from, or None if there is
+    nothing to resume. The claimed file survives until the resumed run
+    succeeds, so a second interruption does not lose it.
+    """
+    tmp_path = partial_path(path)
+    claimed = tmp_path.with_name(tmp_path.name + ".prev")
+    if tmp_path.exists():
+        os.replace(tmp_path, claimed)
+    return claimed if claimed.exists() else None
+
+
+def write_atomic(path, data):
+    """Write bytes to path via a temp file and rename, so readers never see a torn file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def lock_path(path):
+    path = Path(path)
+    return path.with_name(path.name + ".lock")
+
+
+@contextmanager
+def locked(path):
+    """Hold an exclusive lock on path's .lock file for the duration of the block."""
+    lock = lock_path(path)
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_manifest(shard_dir):
+    """Read a shard directory's manifest, or an empty one if there is none yet."""
+    try:
+        with open(Path(shard_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"version": 1, "lessons": {}}
+
+
+class ShardedCardWriter:
+    """Write each lesson to <shard_dir>/<lesson_id>.json and record it in the manifest.
+
+    Several generators share one shard directory, so manifest entries are
+    tagged with their source; on a clean exit this writer replaces only its
+    own source's entries and deletes shards it no longer produces, holding
+    an flock on manifest.json.lock (as course_catalog does for courses.json).
+    """
+
+    def __init__(self, shard_dir, source, compact=False):
+        self.shard_dir = Path(shard_dir)
+        self.source = source
+        self.compact = compact
+        self.count = 0
+        self.entries = {}
+        self.size_rows = []
+
+    def __enter__(self):
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def write(self, lesson_id, lesson):
+        data = (dump_compact(lesson) if self.compact else dump_pretty(lesson)).encode('utf-8')
+        shard_path = self.shard_dir / f"{lesson_id}.json"
+        write_atomic(shard_path, data)
+        if self.compact:
+            raw = len(dump_pretty(lesson).encode('utf-8'))
+            self.size_rows.append((shard_path.name, raw, len(data), write_compressed_siblings(shard_path)))
+        else:
+            remove_compressed_siblings(shard_path)
+        self.entries[lesson_id] = {
+            "title": lesson.get("lessonTitle", ""),
+            "source": self.source,
+            "cards": {t: len(lesson.get(t, [])) for t in CARD_TYPES},
+            "hash": hashlib.sha256(data).hexdigest()[:16],
+        }
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            return False
+        # Generators may finish at the same time; each re-reads the manifest
+        # under the lock so neither drops the other's entries
+        with locked(self.shard_dir / MANIFEST_NAME):
+            self.update_manifest()
+        if self.compact:
+            print_size_report(self.size_rows)
+        return False
+
+    def update_manifest(self):
+        manifest = load_manifest(self.shard_dir)
+        lessons = {}
+        for lesson_id, entry in manifest["lessons"].items():
+            if entry.get("source") != self.source:
+                lessons[lesson_id] = entry
+            elif lesson_id not in self.entries:
+                stale_path = self.shard_dir / f"{lesson_id}.json"
+                stale_path.unlink(missing_ok=True)
+                remove_compressed_siblings(stale_path)
+        lessons.update(self.entries)
+        manifest["lessons"] = lessons
+
+        manifest_path = self.shard_dir / MANIFEST_NAME
+        if self.compact:
+            data = dump_compact(manifest).encode('utf-8')
+            write_atomic(manifest_path, data)
+            raw = len(dump_pretty(manifest).encode('utf-8'))
+            self.size_rows.append((MANIFEST_NAME, raw, len(data), write_compressed_siblings(manifest_path)))
+        else:
+            write_atomic(manifest_path, dump_pretty(manifest).encode('utf-8'))
+            remove_compressed_siblings(manifest_path)
+
+
+def add_output_arguments(parser):
+    """Register the output-format flags shared by all card generators."""
+    layout = parser.add_mutually_exclusive_group()
+    layout.add_argument('--monolithic', dest='monolithic', action='store_true', default=True,
+                        help="write one combined JSON file, which the app imports (default)")
+    layout.add_argument('--shards', dest='monolithic', action='store_false',
+                        help=f"write per-lesson shards and {MANIFEST_NAME} instead")
+    parser.add_argument('--shard-dir', type=Path, default=SHARD_DIR,
+                        help=f"directory for per-lesson shards and {MANIFEST_NAME} (default: {SHARD_DIR})")
+    parser.add_argument('--compact', action='store_true',
+                        help="write minified JSON with sorted keys (shards also get .gz/.br siblings), "
+                             "and print a size report")
+
+
+def card_writer(args, monolithic_path, source):
+    """Open the writer selected by add_output_arguments() flags."""
+    if args.monolithic:
+        return StreamingCardWriter(monolithic_path, compact=args.compact)
+    return ShardedCardWriter(args.shard_dir, source, compact=args.compact)
+
+
+def output_location(args, monolithic_path):
+    """Where card_writer() output ends up, for log messages."""
+    return monolithic_path if args.monolithic else args.shard_dir
+
+
+def load_cards(path):
+    """Load {lesson_id: lesson} from a monolithic card file or a shard directory."""
+    path = Path(path)
+    if path.is_dir():
+        manifest = load_manifest(path)
+        cards = {}
+        for lesson_id in manifest["lessons"]:
+            with open(path / f"{lesson_id}.json", 'r', encoding='utf-8') as f:
+                cards[lesson_id] = json.load(f)
+        return cards
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_lessons(path):
+    """Yield (lesson_id, lesson) from a monolithic card file or a shard directory, one lesson at a time.
+
+    Unlike load_cards(), a monolithic file is read in chunks and decoded
+    member by member with JSONDecoder.raw_decode, so memory is bounded by a
+    chunk plus the current lesson, and any JSON layout is accepted (not just
+    StreamingCardWriter's, as read_partial_lessons() needs). Raises
+    ValueError if the file is not a JSON object; lessons before the fault
+    have been yielded by then.
+    """
+    path = Path(path)
+    if path.is_dir():
+        for lesson_id in load_manifest(path)["lessons"]:
+            with open(path / f"{lesson_id}.json", 'r', encoding='utf-8') as f:
+                yield lesson_id, json.load(f)
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = ''
+        pos = 0
+        offset = 0  # characters dropped from the front of buf so far
+
+        def fill():
+            """Append the next chunk, dropping what has been consumed; False at end of file."""
+            nonlocal buf, pos, offset
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                return False
+            offset += pos
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def peek():
+            """The next non-whitespace character ('' at end of file), not consumed."""
+            nonlocal pos
+            while True:
+                pos = JSON_WHITESPACE_RE.match(buf, pos).end()
+                if pos < len(buf) or not fill():
+                    return buf[pos:pos + 1]
+
+        def expect(chars):
+            char = peek()
+            if not char or char not in chars:
+                raise ValueError(f"expected {' or '.join(map(repr, chars))} at char {offset + pos}")
+            return char
+
+        def value():
+            nonlocal pos
+            while True:
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError as e:
+                    if fill():  # most likely cut off at the end of the chunk
+                        continue
+                    raise ValueError(f"{e.msg} at char {offset + e.pos}") from None
+                # A number running to the end of the chunk may continue in the next one
+                if end == len(buf) and fill():
+                    continue
+                pos = end
+                return obj
+
+        if peek() != '{':
+            raise ValueError("not a {lesson_id: lesson} object")
+        pos += 1
+        if peek() != '}':
+            while True:
+                expect('"')
+                lesson_id = value()
+                expect(':')
+                pos += 1
+                peek()
+                yield lesson_id, value()
+                if expect(',}') == '}':
+                    break
+                pos += 1
+        pos += 1
+        if peek():
+            raise ValueError(f"extra data after the object at char {offset + pos}")
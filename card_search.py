@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Full-text search index over every generated card.
+
+build_index() turns card files into an inverted index with three term
+spaces, each mapping a term to the cards containing it:
+  - cn: Chinese character unigrams and bigrams (bigrams never span punctuation)
+  - py: pinyin syllables with tones stripped, so nǐhǎo, nǐ hǎo, ni3hao3 and
+        nihao all index as ni + hao
+  - en: lowercase English word tokens, minus a few stop words
+
+Cards are numbered in corpus order and posting lists hold those numbers,
+delta-encoded in the file; "ids" maps a number back to its card ID.
+
+SearchIndex is the query API: search("你好"), search("nihao"),
+search("good morning"). Every term of a query must match (AND). Latin
+queries are tried as pinyin and as English and the hits are combined.
+
+Usage:
+  python3 card_search.py                   # build public/search-index.json
+  python3 card_search.py --query 小说       # build, then search
+  python3 card_search.py --bench           # build, then time lookups vs a linear scan
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+import unicodedata
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
+
+from card_output import CARD_FILES, CARD_TYPES, dump_compact, load_cards, write_atomic
+from lesson_text import CHINESE_RE
+
+FORMAT_NAME = "famlingo-search"
+FORMAT_VERSION = 1
+INDEX_FILE = Path("public/search-index.json")
+
+CJK_RUN_RE = re.compile(CHINESE_RE.pattern + '+')
+ENGLISH_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("a an and are at be by for in is it of on or the to".split())
+
+# One pinyin syllable: optional initial, then the longest final that fits.
+# A final ending in n/ng/r only keeps that consonant when no vowel follows,
+# so "fangai" splits as fan + gai and "geren" as ge + ren.
+PINYIN_SYLLABLE_RE = re.compile(
+    r'(?:[zcs]h|[bpmfdtnlgkhjqxrzcsyw])?'
+    r'(?:(?:iang|iong|uang|ang|eng|ing|ong|ian|uan|van|an|en|in|un|vn|er)(?![aeiouv])'
+    r'|iao|uai|ai|ao|ei|ia|ie|iu|ou|ua|ue|ui|uo|ve|a|e|i|o|u|v)'
+)
+
+
+def strip_tones(text):
+    """Lowercase pinyin with tone marks and tone numbers removed, ü written as v."""
+    text = unicodedata.normalize('NFD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c) or c == '\u0308')  # keep ü's diaeresis
+    return unicodedata.normalize('NFC', text).replace('ü', 'v').replace('u:', 'v')
+
+
+def pinyin_terms(text):
+    """Tone-stripped pinyin syllables in text, e.g. 'Nǐhǎo!' -> ['ni', 'hao']."""
+    return [m.group() for word in re.findall(r'[a-zv]+', strip_tones(text))
+            for m in PINYIN_SYLLABLE_RE.finditer(word)]
+
+
+def chinese_terms(text):
+    """Character unigrams and bigrams of each run of Chinese characters."""
+    terms = []
+    for run in CJK_RUN_RE.findall(text):
+        terms.extend(run)
+        terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def english_terms(text):
+    return [t for t in ENGLISH_TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def iter_cards(card_sets):
+    """Yield every card of every card file, in file, lesson and card order."""
+    for cards in card_sets:
+        for lesson in cards.values():
+            for card_type in CARD_TYPES:
+                yield from lesson.get(card_type, [])
+
+
+def build_index(card_sets):
+    """Build the index dict (ready for JSON) from a list of {lesson_id: lesson} dicts."""
+    ids = []
+    postings = {"cn": {}, "py": {}, "en": {}}
+    for number, card in enumerate(iter_cards(card_sets)):
+        ids.append(card["id"])
+        terms = {
+            "cn": chinese_terms(card.get("cn", "")),
+            "py": pinyin_terms(card.get("pinyin", "")),
+            "en": english_terms(card.get("en", "")),
+        }
+        for space, space_terms in terms.items():
+            for term in set(space_terms):
+                postings[space].setdefault(term, []).append(number)
+
+    index = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "ids": ids}
+    for space, terms in postings.items():
+        # Card numbers only grow, so deltas are small and keep the file compact
+        index[space] = {term: [n - prev for n, prev in zip(numbers, [0] + numbers)]
+                        for term, numbers in sorted(terms.items())}
+    return index
+
+
+class SearchIndex:
+    """Query API over build_index() output."""
+
+    def __init__(self, data):
+        if data.get("format") != FORMAT_NAME or data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"not a {FORMAT_NAME} v{FORMAT_VERSION} index")
+        self.ids = data["ids"]
+        self.postings = {space: {term: list(accumulate(deltas)) for term, deltas in data[space].items()}
+                         for space in ("cn", "py", "en")}
+        self.sorted_terms = {space: sorted(terms) for space, terms in self.postings.items()}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def match_all(self, space, terms, prefix=False):
+        """Card numbers whose `space` terms include every term (the last one as a prefix)."""
+        if not terms:
+            return set()
+        lists = []
+        for i, term in enumerate(terms):
+            if prefix and i == len(terms) - 1:
+                lists.append(self.prefix_postings(space, term))
+            else:
+                lists.append(self.postings[space].get(term, ()))
+        lists.sort(key=len)
+        hits = set(lists[0])
+        for numbers in lists[1:]:
+            if not hits:
+                break
+            hits.intersection_update(numbers)
+        return hits
+
+    def prefix_postings(self, space, prefix):
+        terms = self.sorted_terms[space]
+        numbers = set()
+        for i in range(bisect_left(terms, prefix), len(terms)):
+            if not terms[i].startswith(prefix):
+                break
+            numbers.update(self.postings[space][terms[i]])
+        return numbers
+
+    def search(self, query, limit=None, prefix=False):
+        """Card IDs matching query, in corpus order.
+
+        Chinese queries must contain every character bigram of the query (or
+        the character itself for a one-character query). Other queries match
+        cards whose pinyin has every syllable, or whose English has every
+        word. With prefix, the query's last term may be incomplete.
+        """
+        if CHINESE_RE.search(query):
+            terms = []
+            for run in CJK_RUN_RE.findall(query):
+                terms.extend([run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)])
+            hits = self.match_all("cn", terms)
+        else:
+            hits = self.match_all("py", pinyin_terms(query), prefix)
+            # Tone marks mean the query is pinyin, not English
+            if strip_tones(query) == query.lower():
+                hits |= self.match_all("en", english_terms(query), prefix)
+        return [self.ids[n] for n in sorted(hits)[:limit]]
+
+
+def linear_search(rows, query):
+    """Reference scan over (id, cn, tone-stripped pinyin, lowercase en) rows: substring match."""
+    needle = strip_tones(query)
+    return [card_id for card_id, cn, pinyin, en in rows
+            if query in cn or needle in pinyin or needle in en]
+
+
+def benchmark(index, cards, n_queries, repeat):
+    """Time index lookups against a linear scan on queries sampled from the corpus."""
+    rng = random.Random(0)
+    vocab = [c for c in cards if c["id"].split('-')[-1].startswith('V')] or cards
+    queries = []
+    for card in rng.sample(vocab, min(n_queries, len(vocab))):
+        field = rng.choice(("cn", "pinyin", "en"))
+        text = card.get(field, "")
+        queries.append(text.split()[0] if field == "en" and text.split() else text)
+    queries = [q for q in queries if q]
+
+    def per_query(fn):
+        times = []
+        for query in queries:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn(query)
+            times.append((time.perf_counter() - start) / repeat)
+        return times
+
+    # The scan gets its normalisation done up front too, so only lookup time is compared
+    rows = [(c["id"], c.get("cn", ""), strip_tones(c.get("pinyin", "")), c.get("en", "").lower()) for c in cards]
+    indexed = per_query(index.search)
+    scanned = per_query(lambda q: linear_search(rows, q))
+    print(f"\n{len(queries)} queries over {len(cards)} cards (mean of {repeat} runs each)")
+    print(f"{'':12} {'median':>10} {'p99':>10} {'max':>10}")
+    for label, times in (("index", indexed), ("linear scan", scanned)):
+        ordered = sorted(times)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(f"{label:12} {statistics.median(times) * 1e6:>8.1f}us {p99 * 1e6:>8.1f}us {ordered[-1] * 1e6:>8.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the card search index.")
+    parser.add_argument('inputs', nargs='*', type=Path, default=CARD_FILES,
+                        help="card files or shard directories (default: the three src/data card files)")
+    parser.add_argument('-o', '--output', type=Path, default=INDEX_FILE, help=f"index file (default: {INDEX_FILE})")
+    parser.add_argument('--query', action='append', default=[], help="search the new index (repeatable)")
+    parser.add_argument('--bench', action='store_true', help="benchmark lookups against a linear scan")
+    parser.add_argument('--bench-queries', type=int, default=300, help="queries sampled for --bench")
+    args = parser.parse_args()
+
+    card_sets = [load_cards(path) for path in args.inputs]
+    data = build_index(card_sets)
+    text = dump_compact(data)
+    write_atomic(args.output, text.encode('utf-8'))
+    terms = {space: len(data[space]) for space in ("cn", "py", "en")}
+    print(f"Indexed {len(data['ids'])} cards: {terms['cn']} cn, {terms['py']} pinyin, {terms['en']} English terms")
+    print(f"Output: {args.output} ({len(text.encode('utf-8')):,} bytes)")
+
+    index = SearchIndex(json.loads(text))
+    for query in args.query:
+        hits = index.search(query)
+        print(f"\n{query!r}: {len(hits)} cards")
+        for card_id in hits[:20]:
+            print(f"  {card_id}")
+    if args.bench:
+        benchmark(index, list(iter_cards(card_sets)), args.bench_queries, repeat=20)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
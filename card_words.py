@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Canonical word table shared by all card files.
+
+The same word (你好, 书, 小说, ...) shows up as a separate vocab card in the
+course lessons, the study notes and the vocab groups, each time with
+slightly different pinyin spacing or English. consolidate() merges every
+vocab card into one table of words keyed by normalized cn plus normalized
+pinyin. Each vocab card then keeps only the index of its word, any field
+whose text differs from the canonical entry and, unless it follows the
+usual <lesson>-V01 pattern, its id, so expand() can rebuild every card
+file exactly. Sentences and dialogue are kept as they are.
+
+Key normalization: NFKC, lowercase pinyin, PDF look-alike letters (ɑ, ɡ)
+folded to ASCII, tone numbers turned into marks, and spaces, apostrophes,
+hyphens and punctuation dropped. So "nǐ hǎo", "Nǐhǎo", "nǐhǎo!" and
+"ni3 hao3" share a key, while tones still tell mǎi and mài apart. The
+canonical entry is the word's most common (pinyin, en, pos) spelling.
+
+Usage: python3 card_words.py [card files...] [-o src/data/word-table.json]
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+from card_output import CARD_FILES, default_card_id, dump_compact, load_cards, write_atomic
+
+FORMAT_NAME = "famlingo-words"
+FORMAT_VERSION = 1
+OUTPUT_FILE = Path("src/data/word-table.json")
+WORD_FIELDS = ("cn", "pinyin", "en", "pos")
+
+PDF_LOOKALIKES = str.maketrans({'ɑ': 'a', 'ɡ': 'g'})
+KEY_NOISE_RE = re.compile(r"[\s'’\-‐–—.,!?;:·。，！？；：、（）()]+")
+TONE_NUMBER_RE = re.compile(r"([a-zü:]+)([1-5])")
+TONE_MARKS = {'a': 'āáǎà', 'e': 'ēéěè', 'i': 'īíǐì', 'o': 'ōóǒò', 'u': 'ūúǔù', 'ü': 'ǖǘǚǜ'}
+
+
+def normalize_cn(text):
+    return KEY_NOISE_RE.sub('', unicodedata.normalize('NFKC', text))
+
+
+def mark_tone(match):
+    """'hao3' -> 'hǎo', 'lv4' -> 'lǜ': a or e takes the mark, then the o of ou, else the last vowel."""
+    syllable, tone = match.group(1).replace('u:', 'ü').replace('v', 'ü'), int(match.group(2))
+    if tone == 5:
+        return syllable
+    vowels = [i for i, c in enumerate(syllable) if c in TONE_MARKS]
+    if not vowels:
+        return match.group(0)
+    pos = next((i for i in vowels if syllable[i] in 'ae'), None)
+    if pos is None:
+        pos = syllable.find('ou') if 'ou' in syllable else vowels[-1]
+    return syllable[:pos] + TONE_MARKS[syllable[pos]][tone - 1] + syllable[pos + 1:]
+
+
+def normalize_pinyin(text):
+    text = unicodedata.normalize('NFKC', text).lower().translate(PDF_LOOKALIKES)
+    # Tone numbers (ni3hao3) become marks (nǐhǎo) so both spellings share a key
+    text = TONE_NUMBER_RE.sub(mark_tone, unicodedata.normalize('NFC', text))
+    return unicodedata.normalize('NFC', KEY_NOISE_RE.sub('', text))
+
+
+def word_key(card):
+    return f"{normalize_cn(card.get('cn', ''))}|{normalize_pinyin(card.get('pinyin', ''))}"
+
+
+def consolidate(sources):
+    """Build the word table from {source_name: {lesson_id: lesson}}."""
+    spellings = {}  # key -> Counter of (cn, pinyin, en, pos)
+    for cards in sources.values():
+        for lesson in cards.values():
+            for card in lesson.get("vocab", []):
+                spelling = tuple(card.get(f, "") for f in WORD_FIELDS)
+                spellings.setdefault(word_key(card), Counter())[spelling] += 1
+
+    words = []
+    word_index = {}
+    for key, counter in spellings.items():
+        # most_common keeps first-seen order on ties
+        word_index[key] = len(words)
+        words.append(dict(zip(WORD_FIELDS, counter.most_common(1)[0][0])))
+
+    out_sources = {}
+    for name, cards in sources.items():
+        fields = {}
+        lessons = {}
+        for lesson_id, lesson in cards.items():
+            out_lesson = {}
+            for key, value in lesson.items():
+                if key != "vocab":
+                    out_lesson[key] = value
+                    continue
+                vocab = []
+                for i, card in enumerate(value):
+                    field_order = fields.setdefault("vocab", [])
+                    field_order.extend(f for f in card if f not in field_order)
+                    n = word_index[word_key(card)]
+                    ref = {"w": n}
+                    if card.get("id") != default_card_id(lesson_id, "vocab", i):
+                        ref["id"] = card.get("id")
+                    for field in WORD_FIELDS:
+                        # Absent fields are recorded as null so expand() leaves them out
+                        if card.get(field) != words[n][field] or field not in card:
+                            ref[field] = card.get(field)
+                    vocab.append(ref)
+                out_lesson["vocab"] = vocab
+            lessons[lesson_id] = out_lesson
+        out_sources[name] = {"vocab_fields": fields.get("vocab", []), "lessons": lessons}
+
+    return {"format": FORMAT_NAME, "version": FORMAT_VERSION, "words": words, "sources": out_sources}
+
+
+def expand(data, source):
+    """Rebuild one source's {lesson_id: lesson} card dict from the word table."""
+    if data.get("format") != FORMAT_NAME or data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    words = data["words"]
+    entry = data["sources"][source]
+    cards = {}
+    for lesson_id, lesson in entry["lessons"].items():
+        out_lesson = {}
+        for key, value in lesson.items():
+            if key != "vocab":
+                out_lesson[key] = value
+                continue
+            vocab = []
+            for i, ref in enumerate(value):
+                word = words[ref["w"]]
+                card = {}
+                for field in entry["vocab_fields"]:
+                    if field == "id":
+                        card["id"] = ref["id"] if "id" in ref else default_card_id(lesson_id, "vocab", i)
+                    elif field in ref:
+                        if ref[field] is not None:
+                            card[field] = ref[field]
+                    else:
+                        card[field] = word[field]
+                vocab.append(card)
+            out_lesson["vocab"] = vocab
+        cards[lesson_id] = out_lesson
+    return cards
+
+
+def print_report(sources, data):
+    """Duplicate counts per source and overall, then the size comparison."""
+    words = data["words"]
+    key_sources = {}
+    refs = overridden = 0
+    print(f"{'Source':<22} {'vocab':>7} {'words':>7} {'repeats':>8}")
+    for name, entry in data["sources"].items():
+        seen = Counter()
+        for lesson in entry["lessons"].values():
+            for ref in lesson.get("vocab", []):
+                seen[ref["w"]] += 1
+                key_sources.setdefault(ref["w"], set()).add(name)
+                refs += 1
+                overridden += any(f in ref for f in WORD_FIELDS)
+        total = sum(seen.values())
+        print(f"{name:<22} {total:>7} {len(seen):>7} {total - len(seen):>8}")
+
+    shared = sum(1 for names in key_sources.values() if len(names) > 1)
+    print(f"\n{refs} vocab cards -> {len(words)} canonical words ({refs - len(words)} duplicates)")
+    print(f"  {shared} words appear in more than one card file")
+    print(f"  {overridden} cards differ from their canonical spelling and keep their own text")
+
+    # Vocab alone (what consolidation touches), then everything
+    vocab_before = dump_compact([lesson.get("vocab", []) for cards in sources.values() for lesson in cards.values()])
+    vocab_after = dump_compact([words] + [lesson.get("vocab", []) for entry in data["sources"].values()
+                                          for lesson in entry["lessons"].values()])
+    all_before = ''.join(dump_compact(cards) for cards in sources.values())
+    all_after = dump_compact(data)
+    print(f"\n{'':26} {'minified':>10} {'gzip':>10} {'saved':>7}")
+    for label, before, after in (("vocab cards", vocab_before, vocab_after), ("all cards", all_before, all_after)):
+        before, after = before.encode('utf-8'), after.encode('utf-8')
+        print(f"{label + ' (before)':<26} {len(before):>10,} {len(gzip.compress(before, 9)):>10,}")
+        print(f"{label + ' (word table)':<26} {len(after):>10,} {len(gzip.compress(after, 9)):>10,} "
+              f"{1 - len(after) / len(before):>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge vocab cards from all card files into a canonical word table.")
+    parser.add_argument('inputs', nargs='*', type=Path, default=CARD_FILES,
+                        help="card files or shard directories (default: the three src/data card files)")
+    parser.add_argument('-o', '--output', type=Path, default=OUTPUT_FILE, help=f"output file (default: {OUTPUT_FILE})")
+    args = parser.parse_args()
+
+    # Sources are named by file stem in the table, so two inputs must not share one
+    stems = Counter(path.stem for path in args.inputs)
+    clashes = sorted(str(path) for path in args.inputs if stems[path.stem] > 1)
+    if clashes:
+        parser.error(f"inputs share a file name, which names their source: {', '.join(clashes)}")
+    sources = {path.stem: load_cards(path) for path in args.inputs}
+    data = consolidate(sources)
+    text = dump_compact(data)
+
+    # Refuse to write a table that does not rebuild every input exactly
+    reread = json.loads(text)
+    for name, cards in sources.items():
+        if expand(reread, name) != cards:
+            print(f"ERROR: word table does not reproduce {name}")
+            return 1
+    write_atomic(args.output, text.encode('utf-8'))
+
+    print_report(sources, data)
+    print(f"\nOutput: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
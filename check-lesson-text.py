@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Golden check for lesson_text.py.
+Runs the text cleaning functions, line classifiers and section splitter
+from lesson_text.py and the original implementations (kept verbatim below)
+over every lesson PDF, verifies the output is identical, and reports the
+speedup per lesson for cleaning plus corpus-wide microbenchmarks. The
+section splitter is also fuzzed with random keyword soup.
+
+Usage: python3 check-lesson-text.py [--root resources/courses] [--repeat 5] [--fuzz 20000]
+Exits non-zero if any output differs.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+import lesson_text
+from lesson_text import cjk_compat_map
+from script_loader import load_script
+
+RESOURCES_DIR = Path("resources/courses")
+
+
+# ─── Reference implementations (pre-lesson_text.py) ───
+
+def legacy_fix_cjk_compat(text):
+    CJK_COMPAT_MAP = cjk_compat_map()
+    result = []
+    for char in text:
+        result.append(CJK_COMPAT_MAP.get(char, char))
+    return ''.join(result)
+
+
+def legacy_clean_line(line):
+    line = line.replace('\x01', ' ')
+    line = legacy_fix_cjk_compat(line)
+    line = re.sub(r'  +', ' ', line).strip()
+    line = line.replace('ﬁ', 'fi').replace('ﬂ', 'fl').replace('ﬀ', 'ff').replace('ﬃ', 'ffi').replace('ﬄ', 'ffl')
+    return line
+
+
+def legacy_clean_text(text):
+    text = re.sub(r'CHI\s*NES\s*ECLAS\s*S\s*101\.COM.*?\n', '\n', text)
+    text = re.sub(r'CHINESECLASS101\.COM.*?\n', '\n', text)
+    text = re.sub(r'^\d+\s*$', '', text, flags=re.MULTILINE)
+    text = re.sub(r"CONT'D OVER\s*", '', text)
+    text = text.replace('\x01', ' ')
+    text = legacy_fix_cjk_compat(text)
+    text = text.replace('ﬁ', 'fi').replace('ﬂ', 'fl').replace('ﬀ', 'ff').replace('ﬃ', 'ffi').replace('ﬄ', 'ffl')
+    text = re.sub(r'(?:ABSOLUTE BEGINNER|BEGINNER|ELEMENTARY|LOWER INTERMEDIATE|INTERMEDIATE|UPPER INTERMEDIATE)\s+(?:S\d+|SEASON)\s+(?:S\d+\s+)?#\d+', '', text)
+    return text
+
+
+def legacy_strip_leaked_headers(text):
+    if not text:
+        return text
+    text = re.sub(r'\s*(?:ABS\s*OLUTE\s+)?(?:UPPER\s+)?(?:LOWER\s+)?(?:BEGI\s*NNER|I\s*NTERMEDI\s*ATE|ELEMENTARY)\s+S(?:EASON)?\s*\d.*$', '', text, flags=re.IGNORECASE).strip()
+    text = re.sub(r'\s*(?:ABSOLUTE BEGINNER|UPPER BEGINNER|LOWER BEGINNER|BEGINNER|ELEMENTARY|LOWER INTERMEDIATE|INTERMEDIATE|UPPER INTERMEDIATE)\s+S(?:EASON)?\s*\d.*$', '', text, flags=re.IGNORECASE).strip()
+    text = re.sub(r'\s*CHINESECLASS101\.COM.*$', '', text).strip()
+    text = re.sub(r'\s*GENGO\s+CHI\s*NES\s*E\s+S\s*\d.*$', '', text).strip()
+    return text
+
+
+def legacy_has_chinese(text):
+    for char in text:
+        cp = ord(char)
+        if (0x4E00 <= cp <= 0x9FFF or  # CJK Unified
+            0x3400 <= cp <= 0x4DBF or  # CJK Extension A
+            0x2E80 <= cp <= 0x2EFF or  # CJK Radicals Supplement
+            0x2F00 <= cp <= 0x2FDF or  # Kangxi Radicals
+            0xF900 <= cp <= 0xFAFF):   # CJK Compatibility
+            return True
+    return False
+
+
+def legacy_is_pinyin(text):
+    tone_chars = 'āáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜ'
+    if any(c in text for c in tone_chars):
+        return True
+    if re.match(r'^[A-Z][a-z]', text) and not legacy_has_chinese(text) and len(text) > 3:
+        pinyin_syllables = ['shi', 'zhi', 'chi', 'de', 'le', 'ma', 'ne',
+                           'jiào', 'shénme', 'míng', 'wèi', 'fáng', 'zuò']
+        text_lower = text.lower()
+        for s in pinyin_syllables:
+            if s in text_lower:
+                return True
+    return False
+
+
+def legacy_is_pinyin_like(text):
+    tone_chars = 'āáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜ'
+    return any(c in text for c in tone_chars)
+
+
+LEGACY_SECTION_RES = {
+    'dialogue_cn': r'SIMPLIFIED CHINESE\s*\n(.*?)(?:TRADITIONAL CHINESE|PINYIN)',
+    'dialogue_pinyin': r'PINYIN\s*\n(.*?)(?:ENGLISH)',
+    'dialogue_en': r'ENGLISH\s*\n(.*?)(?:VOCABULARY|$)',
+    'vocabulary': r'VOCABULARY\s*\n(.*?)(?:SAMPLE\s*SENTENCES|VOCABULARY\s*PHRASE\s*USAGE|GRAMMAR|CULTURAL\s*INSIGHT|$)',
+    'sample_sentences': r'SAMPLE\s*SENTENCES\s*\n(.*?)(?:VOCABULARY\s*PHRASE\s*USAGE|GRAMMAR|CULTURAL\s*INSIGHT|$)',
+}
+
+# Keywords, near-misses and whitespace for the section splitter fuzz test
+SECTION_FUZZ_PIECES = [
+    'SIMPLIFIED CHINESE', 'TRADITIONAL CHINESE', 'PINYIN', 'ENGLISH', 'VOCABULARY', 'SAMPLE',
+    'SENTENCES', 'SAMPLE SENTENCES', 'GRAMMAR', 'CULTURAL', 'INSIGHT', 'CULTURAL INSIGHT',
+    'PHRASE', 'USAGE', 'VOCABULARY PHRASE USAGE', 'SAMPLENGLISH', 'CHINESENGLISH', 'ENGLIS', 'E',
+    '\n', '\n\n', ' ', '\t', ' \n ', '\u3000', '\x0b', 'x', '你好', '1.',
+]
+
+
+def legacy_split_sections(text):
+    """Section spans as the parsers' original DOTALL searches found them."""
+    sections = {}
+    for name, pattern in LEGACY_SECTION_RES.items():
+        match = re.search(pattern, text, re.DOTALL)
+        if match:
+            sections[name] = match.span(1)
+    return sections
+
+
+def run_cleaning(impl, dict_lines, plain_text):
+    """Apply one implementation's cleaning functions the way the extractor does."""
+    fix_cjk, clean_line, clean_text, strip_headers = impl
+    cleaned_lines = [clean_line(line) for line in dict_lines]
+    return {
+        "fix_cjk_compat": fix_cjk(plain_text),
+        "clean_line": cleaned_lines,
+        "clean_text": clean_text(plain_text),
+        "strip_leaked_headers": [strip_headers(line) for line in cleaned_lines],
+    }
+
+
+def time_cleaning(impl, dict_lines, plain_text, repeat):
+    """Best-of-N wall time for one implementation on one lesson."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_cleaning(impl, dict_lines, plain_text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def classify_lines(impl, lines):
+    """Classify each line with one implementation's (has_chinese, is_pinyin, is_pinyin_like)."""
+    has_chinese, is_pinyin, is_pinyin_like = impl
+    return [(has_chinese(line), is_pinyin(line), is_pinyin_like(line)) for line in lines]
+
+
+def time_parsers(extractor, impl, texts, repeat):
+    """Best-of-N time for parse_vocabulary + parse_sample_sentences over all lessons."""
+    saved = extractor.has_chinese, extractor.is_pinyin, extractor.is_pinyin_like
+    extractor.has_chinese, extractor.is_pinyin, extractor.is_pinyin_like = impl
+    try:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for text in texts:
+                lesson_text.clear_classifier_cache()
+                extractor.parse_vocabulary(text)
+                extractor.parse_sample_sentences(text)
+            best = min(best, time.perf_counter() - start)
+        return best
+    finally:
+        extractor.has_chinese, extractor.is_pinyin, extractor.is_pinyin_like = saved
+
+
+def check_classifiers(extractor, cleaned_texts, repeat):
+    """Compare classifiers on every corpus line and print the microbenchmark; returns mismatches."""
+    legacy = (legacy_has_chinese, legacy_is_pinyin, legacy_is_pinyin_like)
+    current = (lesson_text.has_chinese, lesson_text.is_pinyin, lesson_text.is_pinyin_like)
+    lessons = [[l.strip() for l in text.split('\n') if l.strip()] for text in cleaned_texts]
+
+    mismatches = 0
+    for lines in lessons:
+        lesson_text.clear_classifier_cache()
+        mismatches += sum(a != b for a, b in zip(classify_lines(legacy, lines), classify_lines(current, lines)))
+
+    timings = {}
+    for label, impl in (("legacy", legacy), ("current", current)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for lines in lessons:
+                lesson_text.clear_classifier_cache()
+                classify_lines(impl, lines)
+            best = min(best, time.perf_counter() - start)
+        timings[label] = (best, time_parsers(extractor, impl, cleaned_texts, repeat))
+
+    n_lines = sum(len(lines) for lines in lessons)
+    print(f"\nClassifiers over {n_lines} lines: {mismatches} mismatched")
+    for stage, idx in (("classify every line once", 0), ("vocab + sentence parsers", 1)):
+        old, new = timings["legacy"][idx], timings["current"][idx]
+        print(f"  {stage:26s} {old * 1000:8.1f}ms -> {new * 1000:7.1f}ms  ({old / new:4.1f}x)")
+    return mismatches
+
+
+def check_sections(cleaned_texts, fuzz, repeat):
+    """Compare split_sections with the original searches on the corpus and fuzz input; returns mismatches."""
+    mismatches = sum(legacy_split_sections(t) != lesson_text.split_sections(t) for t in cleaned_texts)
+
+    rng = random.Random(0)
+    fuzz_mismatches = 0
+    for _ in range(fuzz):
+        text = ''.join(rng.choice(SECTION_FUZZ_PIECES) for _ in range(rng.randint(0, 25)))
+        if legacy_split_sections(text) != lesson_text.split_sections(text):
+            fuzz_mismatches += 1
+            if fuzz_mismatches <= 5:
+                print(f"  section mismatch: {text!r}")
+
+    timings = {}
+    for label, split in (("legacy", legacy_split_sections), ("current", lesson_text.split_sections)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for text in cleaned_texts:
+                split(text)
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+
+    print(f"\nSections: {mismatches} of {len(cleaned_texts)} lessons mismatched, "
+          f"{fuzz_mismatches} of {fuzz} fuzz cases mismatched")
+    old, new = timings["legacy"], timings["current"]
+    print(f"  {'split all sections':26s} {old * 1000:8.1f}ms -> {new * 1000:7.1f}ms  ({old / new:4.1f}x)")
+    return mismatches + fuzz_mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check lesson_text.py against the original cleaning and classifier functions.")
+    parser.add_argument('--root', type=Path, default=RESOURCES_DIR, help="course resources directory")
+    parser.add_argument('--repeat', type=int, default=5, help="timing repetitions per lesson (best of N)")
+    parser.add_argument('--fuzz', type=int, default=20000, help="random texts for the section splitter check")
+    args = parser.parse_args()
+
+    extractor = load_script("extract-lesson-cards.py")
+    legacy = (legacy_fix_cjk_compat, legacy_clean_line, legacy_clean_text, legacy_strip_leaked_headers)
+    current = (lesson_text.fix_cjk_compat, lesson_text.clean_line, lesson_text.clean_text, lesson_text.strip_leaked_headers)
+
+    pdfs = sorted(args.root.glob("level-*/materials/*-lesson.pdf"))
+    if not pdfs:
+        print(f"No lesson PDFs found under {args.root}")
+        return 1
+
+    failures = 0
+    total_legacy = total_current = 0.0
+    cleaned_texts = []
+    for pdf_path in pdfs:
+        name = f"{pdf_path.parent.parent.name}/{pdf_path.name}"
+        dict_lines, plain_text = extractor.extract_text(pdf_path)
+        cleaned_texts.append(lesson_text.clean_text(plain_text))
+
+        expected = run_cleaning(legacy, dict_lines, plain_text)
+        actual = run_cleaning(current, dict_lines, plain_text)
+        mismatched = [key for key in expected if expected[key] != actual[key]]
+        if mismatched:
+            failures += 1
+            print(f"  {name}: MISMATCH in {', '.join(mismatched)}")
+            continue
+
+        t_legacy = time_cleaning(legacy, dict_lines, plain_text, args.repeat)
+        t_current = time_cleaning(current, dict_lines, plain_text, args.repeat)
+        total_legacy += t_legacy
+        total_current += t_current
+        print(f"  {name}: {t_legacy * 1000:7.2f}ms -> {t_current * 1000:6.2f}ms  ({t_legacy / t_current:4.1f}x)")
+
+    print(f"\n{'='*60}")
+    print(f"{len(pdfs)} lessons, {failures} mismatched")
+    if total_current:
+        print(f"Cleaning time: {total_legacy * 1000:.1f}ms -> {total_current * 1000:.1f}ms "
+              f"({total_legacy / total_current:.1f}x)")
+    failures += check_classifiers(extractor, cleaned_texts, args.repeat)
+    failures += check_sections(cleaned_texts, args.fuzz, args.repeat)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
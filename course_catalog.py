@@ -0,0 +1,70 @@
+"""
+Safe updates of the course catalog (src/data/courses.json).
+
+Several build steps write courses.json: sanitize-resources.sh generates it
+and generate-vocab-groups.py adds its lessons to the study-notes level.
+update_catalog() serializes them with an exclusive flock on a sibling
+<file>.lock (the catalog itself is replaced on every write, so it cannot
+hold the lock), re-reads the file under the lock, applies the change and
+writes the result with write_atomic(), so a reader or a crashed writer
+never leaves a torn file behind.
+
+Shell steps take the same lock with flock(1):
+  flock src/data/courses.json.lock mv courses.json.tmp src/data/courses.json
+"""
+
+import copy
+import json
+from pathlib import Path
+
+from card_output import dump_pretty, locked, write_atomic
+
+COURSES_FILE = Path("src/data/courses.json")
+
+
+def update_catalog(update, path=COURSES_FILE, default=None):
+    """Apply update(catalog) to the JSON catalog at path under the lock; returns update's result.
+
+    update edits the parsed catalog in place. The file is rewritten only if
+    the result differs from what was read. If path does not exist yet and
+    default is given, update starts from a copy of default.
+    """
+    with locked(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            catalog = json.loads(text)
+        except FileNotFoundError:
+            if default is None:
+                raise
+            text = None
+            catalog = copy.deepcopy(default)
+        result = update(catalog)
+        new_text = dump_pretty(catalog)
+        # Leave an unchanged catalog alone so its mtime only moves on real changes
+        if new_text != text:
+            write_atomic(path, new_text.encode('utf-8'))
+    return result
+
+
+def find_level(catalog, level_id):
+    for level in catalog.get("levels", []):
+        if level["id"] == level_id:
+            return level
+    return None
+
+
+def replace_lessons(level, prefix, lessons):
+    """Put lessons first in level, replacing every lesson whose id starts with prefix.
+
+    Running it again with the same lessons gives the same catalog. Fields a
+    replaced entry had that the new one lacks (an audioPath added by a later
+    step, say) are kept. Every lesson's order is renumbered from 1.
+    """
+    old = {ls["id"]: ls for ls in level.get("lessons", []) if ls["id"].startswith(prefix)}
+    kept = [ls for ls in level.get("lessons", []) if not ls["id"].startswith(prefix)]
+    merged = [{**old.get(ls["id"], {}), **ls} for ls in lessons]
+    level["lessons"] = merged + kept
+    for order, ls in enumerate(level["lessons"], 1):
+        ls["order"] = order
+    return len(merged), len(old)
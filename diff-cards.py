@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Card-level diff between two extraction runs.
+
+Loads two card outputs (monolithic JSON files or shard directories), indexes
+every card by its id and reports, per lesson, the cards that were added,
+removed or modified, with the old and new value of each changed field.
+Lessons whose cards only moved around, or whose title changed, are listed
+too, since their shards still need rebuilding.
+
+Usage:
+  python3 diff-cards.py OLD NEW               # readable report
+  python3 diff-cards.py OLD NEW --json        # same data as JSON
+  python3 diff-cards.py OLD NEW --changed-lessons   # one changed lesson ID per line
+
+Exits 0 when the outputs hold identical cards, 1 when they differ (like diff).
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from card_output import CARD_TYPES, load_cards
+
+
+def index_cards(cards):
+    """{card_id: (lesson_id, card_type, card)} for every card in a card file."""
+    index = {}
+    for lesson_id, lesson in cards.items():
+        for card_type in CARD_TYPES:
+            for card in lesson.get(card_type, []):
+                index[card["id"]] = (lesson_id, card_type, card)
+    return index
+
+
+def field_changes(old, new):
+    """{field: [old value, new value]} for fields that differ (None = field absent)."""
+    changes = {}
+    for field in list(old) + [f for f in new if f not in old]:
+        if old.get(field) != new.get(field):
+            changes[field] = [old.get(field), new.get(field)]
+    return changes
+
+
+def diff_cards(old_cards, new_cards):
+    """Per-lesson differences between two card dicts, in new-file lesson order.
+
+    Returns {lesson_id: {"status", "title", "added", "removed", "modified"}}
+    for changed lessons only. status is "added", "removed" or "changed".
+    A changed lesson with no card-level entries had its title changed or
+    its cards reordered.
+    """
+    old_index = index_cards(old_cards)
+    new_index = index_cards(new_cards)
+
+    report = {}
+
+    def lesson_entry(lesson_id):
+        if lesson_id not in old_cards:
+            status = "added"
+        elif lesson_id not in new_cards:
+            status = "removed"
+        else:
+            status = "changed"
+        return report.setdefault(lesson_id, {"status": status, "title": None,
+                                             "added": [], "removed": [], "modified": []})
+
+    lesson_ids = list(new_cards) + [l for l in old_cards if l not in new_cards]
+    for lesson_id in lesson_ids:
+        if old_cards.get(lesson_id) != new_cards.get(lesson_id):
+            entry = lesson_entry(lesson_id)
+            old_title = (old_cards.get(lesson_id) or {}).get("lessonTitle")
+            new_title = (new_cards.get(lesson_id) or {}).get("lessonTitle")
+            if entry["status"] == "changed" and old_title != new_title:
+                entry["title"] = [old_title, new_title]
+
+    for card_id, (lesson_id, card_type, card) in new_index.items():
+        old = old_index.get(card_id)
+        if old is None:
+            lesson_entry(lesson_id)["added"].append({"id": card_id, "type": card_type, "card": card})
+        elif old[2] != card or old[:2] != (lesson_id, card_type):
+            entry = {"id": card_id, "type": card_type, "fields": field_changes(old[2], card)}
+            if old[:2] != (lesson_id, card_type):
+                entry["moved_from"] = list(old[:2])
+            lesson_entry(lesson_id)["modified"].append(entry)
+
+    for card_id, (lesson_id, card_type, card) in old_index.items():
+        if card_id not in new_index:
+            lesson_entry(lesson_id)["removed"].append({"id": card_id, "type": card_type, "card": card})
+
+    return report
+
+
+def format_value(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def print_report(report, old_cards, new_cards):
+    for lesson_id, entry in report.items():
+        counts = ', '.join(f"{len(entry[k])} {k}" for k in ("added", "removed", "modified") if entry[k])
+        print(f"\n{lesson_id} ({entry['status']}{': ' + counts if counts else ''})")
+        if entry["title"]:
+            print(f"  title: {format_value(entry['title'][0])} -> {format_value(entry['title'][1])}")
+        for card in entry["added"]:
+            print(f"  + {card['id']}  {card['card'].get('cn', '')}  {card['card'].get('en', '')}")
+        for card in entry["removed"]:
+            print(f"  - {card['id']}  {card['card'].get('cn', '')}  {card['card'].get('en', '')}")
+        for card in entry["modified"]:
+            moved = f"  (moved from {card['moved_from'][0]} {card['moved_from'][1]})" if "moved_from" in card else ""
+            print(f"  ~ {card['id']}{moved}")
+            for field, (old, new) in card["fields"].items():
+                print(f"      {field}: {format_value(old)} -> {format_value(new)}")
+        if entry["status"] == "changed" and not (counts or entry["title"]):
+            print("  cards reordered")
+
+    totals = {k: sum(len(e[k]) for e in report.values()) for k in ("added", "removed", "modified")}
+    print(f"\n{'='*60}")
+    print(f"{len(old_cards)} -> {len(new_cards)} lessons, {len(report)} changed")
+    print(f"Cards: {totals['added']} added, {totals['removed']} removed, {totals['modified']} modified")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two card outputs card by card.")
+    parser.add_argument('old', help="earlier card file or shard directory")
+    parser.add_argument('new', help="later card file or shard directory")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--json', action='store_true', help="print the diff as JSON")
+    mode.add_argument('--changed-lessons', action='store_true',
+                      help="print only the IDs of lessons that differ, one per line")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    old_cards = load_cards(args.old)
+    new_cards = load_cards(args.new)
+    report = diff_cards(old_cards, new_cards)
+
+    if args.changed_lessons:
+        for lesson_id in report:
+            print(lesson_id)
+    elif args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report, old_cards, new_cards)
+        print(f"({time.perf_counter() - start:.2f}s)")
+    return 1 if report else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
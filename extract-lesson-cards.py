@@ -7,80 +7,84 @@ and outputs a structured JSON file for use in the FamLingo app.
 Handles two PDF formats:
   - Levels 1-4: Sections titled "SIMPLIFIED CHINESE", "TRADITIONAL CHINESE", "PINYIN", "ENGLISH"
   - Level 5: Sections titled "DIALOGUE - CHINESE" (with \x01 separators), "ENGLISH", "PINYIN"
+
+Inputs are directories or zip archives (default: resources/courses). Every
+file whose path inside an input matches --lesson-pattern is a lesson; the
+pattern's named groups "level" and "lesson" give its ID. Zip members are
+read straight into memory, so a vendor bundle needs no unpacking.
 """
 
-import fitz  # PyMuPDF
+import argparse
+import hashlib
 import json
+import os
 import re
-import unicodedata
+import sys
+import traceback
+import zipfile
+from functools import lru_cache, partial
 from pathlib import Path
 
+from card_output import (
+    add_output_arguments, card_writer, claim_partial_output, output_location,
+    partial_path, read_partial_lessons,
+)
+from lesson_profile import NULL_PROFILE, LessonProfile, dump_cprofile, print_profile_report
+from lesson_text import (
+    clean_line, clean_text, split_sections, strip_leaked_headers,
+    clear_classifier_cache, has_chinese, is_pinyin, is_pinyin_like,
+)
+
 RESOURCES_DIR = Path("resources/courses")
+# Matched against each file's path relative to its input root or zip archive
+LESSON_PATTERN = r'^level-(?P<level>[1-5])/materials/(?P<lesson>\d+)-lesson\.pdf$'
 OUTPUT_FILE = Path("src/data/course-cards.json")
+CACHE_DIR = Path(".cache/lesson-cards")
 
-# CJK Compatibility Ideographs -> Standard CJK Unified Ideographs
-CJK_COMPAT_MAP = {}
-def build_cjk_compat_map():
-    """Build mapping from CJK compatibility forms to standard forms."""
-    # CJK Compatibility Ideographs (F900-FAFF) and CJK Radicals Supplement (2E80-2EFF)
-    # plus CJK Radicals (2F00-2FDF)
-    for cp in range(0x2E80, 0x2FE0):
-        char = chr(cp)
-        decomp = unicodedata.decomposition(char)
-        if decomp:
-            parts = decomp.split()
-            # Take the last codepoint as the standard form
-            try:
-                standard = chr(int(parts[-1], 16))
-                CJK_COMPAT_MAP[char] = standard
-            except (ValueError, IndexError):
-                pass
-    for cp in range(0xF900, 0xFB00):
-        char = chr(cp)
-        decomp = unicodedata.decomposition(char)
-        if decomp:
-            parts = decomp.split()
-            try:
-                standard = chr(int(parts[-1], 16))
-                CJK_COMPAT_MAP[char] = standard
-            except (ValueError, IndexError):
-                pass
-
-build_cjk_compat_map()
-
-# Manual mappings for CJK radicals without decomposition -> standard simplified Chinese
-MANUAL_CJK_MAP = {
-    '\u2EA0': '\u6C11',  # ⺠ -> 民 (CIVILIAN)
-    '\u2EC4': '\u897F',  # ⻄ -> 西 (WEST)
-    '\u2EC5': '\u89C1',  # ⻅ -> 见 (SEE)
-    '\u2EC9': '\u8D1D',  # ⻉ -> 贝 (SHELL)
-    '\u2ECB': '\u8F66',  # ⻋ -> 车 (CART)
-    '\u2ED1': '\u957F',  # ⻑ -> 长 (LONG ONE)
-    '\u2ED3': '\u957F',  # ⻓ -> 长 (LONG)
-    '\u2EDA': '\u9875',  # ⻚ -> 页 (LEAF/PAGE)
-    '\u2EDB': '\u98CE',  # ⻛ -> 风 (WIND)
-    '\u2EDD': '\u98DF',  # ⻝ -> 食 (EAT)
-    '\u2EE2': '\u9A6C',  # ⻢ -> 马 (HORSE)
-    '\u2EE5': '\u9C7C',  # ⻥ -> 鱼 (FISH)
-    '\u2EE8': '\u9EA6',  # ⻨ -> 麦 (WHEAT)
-    '\u2EE9': '\u9EC4',  # ⻩ -> 黄 (YELLOW)
-    '\u2EEC': '\u9F50',  # ⻬ -> 齐 (EVEN)
-    '\u2EF0': '\u9F99',  # ⻰ -> 龙 (DRAGON)
-    '\u2E9F': '\u6BCD',  # ⺟ -> 母 (MOTHER)
-}
-CJK_COMPAT_MAP.update(MANUAL_CJK_MAP)
-
-def fix_cjk_compat(text):
-    """Replace CJK compatibility ideographs with standard forms."""
-    result = []
-    for char in text:
-        result.append(CJK_COMPAT_MAP.get(char, char))
-    return ''.join(result)
+# Source files whose contents decide parser output; editing any of them
+# invalidates every cached lesson.
+PARSER_SOURCES = [Path(__file__), Path(__file__).with_name("lesson_text.py")]
+
+
+class ZipMember:
+    """A PDF inside a zip archive, usable wherever a lesson's Path is.
+
+    Only the archive path and member name are stored, so tasks holding one
+    pickle cheaply to worker processes; each process opens the archive itself.
+    """
+
+    def __init__(self, archive, name):
+        self.archive = Path(archive)
+        self.name = name
+
+    def read_bytes(self):
+        return open_archive(self.archive, os.getpid()).read(self.name)
+
+    def __str__(self):
+        return f"{self.archive}:{self.name}"
+
+
+@lru_cache(maxsize=None)
+def open_archive(archive, pid):
+    """Open a zip once per process (keyed by pid: forked workers must not share the file offset)."""
+    return zipfile.ZipFile(archive)
+
+
+def open_pdf(pdf_path):
+    """Open a PDF with PyMuPDF, from a file or from memory for a ZipMember.
+
+    fitz is imported here rather than at module level: it takes ~100ms to
+    import, and tools that only use the text helpers never open a PDF.
+    """
+    import fitz  # PyMuPDF
+    if isinstance(pdf_path, ZipMember):
+        return fitz.open(stream=pdf_path.read_bytes(), filetype='pdf')
+    return fitz.open(pdf_path)
 
 
 def extract_text_dict(pdf_path):
     """Extract text using dict mode (preserves word boundaries via spans)."""
-    doc = fitz.open(pdf_path)
+    doc = open_pdf(pdf_path)
     all_lines = []
     for page in doc:
         blocks = page.get_text('dict')['blocks']
@@ -96,7 +100,7 @@ def extract_text_dict(pdf_path):
 
 def extract_text_plain(pdf_path):
     """Extract all text from a PDF as plain text."""
-    doc = fitz.open(pdf_path)
+    doc = open_pdf(pdf_path)
     full_text = ""
     for page in doc:
         full_text += page.get_text() + "\n"
@@ -104,31 +108,70 @@ def extract_text_plain(pdf_path):
     return full_text
 
 
-def clean_line(line):
-    """Clean a single line: remove control chars, fix CJK, normalize spaces."""
-    # Replace \x01 with space (Level 5 PDF word separator)
-    line = line.replace('\x01', ' ')
-    # Fix CJK compatibility chars
-    line = fix_cjk_compat(line)
-    # Normalize multiple spaces
-    line = re.sub(r'  +', ' ', line).strip()
-    # Fix ligatures
-    line = line.replace('ﬁ', 'fi').replace('ﬂ', 'fl').replace('ﬀ', 'ff').replace('ﬃ', 'ffi').replace('ﬄ', 'ffl')
-    return line
-
-
-def clean_text(text):
-    """Clean full extracted text."""
-    text = re.sub(r'CHI\s*NES\s*ECLAS\s*S\s*101\.COM.*?\n', '\n', text)
-    text = re.sub(r'CHINESECLASS101\.COM.*?\n', '\n', text)
-    text = re.sub(r'^\d+\s*$', '', text, flags=re.MULTILINE)
-    text = re.sub(r"CONT'D OVER\s*", '', text)
-    text = text.replace('\x01', ' ')
-    text = fix_cjk_compat(text)
-    text = text.replace('ﬁ', 'fi').replace('ﬂ', 'fl').replace('ﬀ', 'ff').replace('ﬃ', 'ffi').replace('ﬄ', 'ffl')
-    # Remove level header lines that leak into content
-    text = re.sub(r'(?:ABSOLUTE BEGINNER|BEGINNER|ELEMENTARY|LOWER INTERMEDIATE|INTERMEDIATE|UPPER INTERMEDIATE)\s+(?:S\d+|SEASON)\s+(?:S\d+\s+)?#\d+', '', text)
-    return text
+# detect_pdf_format() reads the first 30 dict-mode lines, the title the first 20
+HEAD_LINES = 30
+DIALOGUE_B_HEADERS = ('SIMPLIFIED', 'ENGLISH', 'PINYIN')
+DIALOGUE_B_TERMINATORS = ('VOCABULARY', 'VOCAB', 'SAMPLE SENTENCES', 'GRAMMAR', 'CULTURAL INSIGHT')
+
+
+def dialogue_b_page_state(page_text, in_section):
+    """Follow parse_dialogue_format_b's section tracking over one page of plain text.
+
+    Returns (uses_page, in_section_at_end): whether any of the page's lines
+    can end up in a dialogue section, and whether a section is still open
+    when the page ends. Plain text comes from the same laid-out page as the
+    dict-mode lines, with the same line breaks, so the headers line up.
+    """
+    uses_page = in_section
+    for raw_line in page_text.split('\n'):
+        upper = clean_line(raw_line).upper()
+        if ('DIALOGUE' in upper and 'CHINESE' in upper) or upper in DIALOGUE_B_TERMINATORS:
+            in_section = False
+        elif upper in DIALOGUE_B_HEADERS:
+            in_section = uses_page = True
+    return uses_page, in_section
+
+
+def extract_text(pdf_path, full_layout=True):
+    """Extract dict-mode lines and plain text in a single pass.
+
+    Each page is laid out once into a TextPage that feeds both the dict-mode
+    line list (same as extract_text_dict) and the plain text (same as
+    extract_text_plain), so the PDF is opened and walked only once.
+
+    With full_layout=False, dict-mode lines are only built for the pages
+    process_lesson_pdf reads them from: the opening pages (format detection
+    and title) and, for format B, the pages holding the dialogue sections.
+    The long grammar and cultural pages then only cost their plain text.
+    """
+    doc = open_pdf(pdf_path)
+    import fitz  # already loaded by open_pdf
+    all_lines = []
+    text_parts = []
+    fmt = None
+    in_section = False
+    for page in doc:
+        # Plain-text flags: dict mode would also keep images, which we skip anyway
+        textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+        page_text = page.get_text(textpage=textpage)
+
+        use_dict = full_layout
+        if not full_layout:
+            uses_dialogue, in_section = dialogue_b_page_state(page_text, in_section)
+            if fmt is None and len(all_lines) >= HEAD_LINES:
+                fmt = detect_pdf_format(all_lines)
+            use_dict = fmt is None or (fmt == 'B' and uses_dialogue)
+
+        if use_dict:
+            for block in page.get_text('dict', textpage=textpage)['blocks']:
+                if 'lines' not in block:
+                    continue
+                for line in block['lines']:
+                    all_lines.append(' '.join(span['text'] for span in line['spans']))
+        text_parts.append(page_text)
+        text_parts.append("\n")
+    doc.close()
+    return all_lines, ''.join(text_parts)
 
 
 def detect_pdf_format(lines):
@@ -177,18 +220,26 @@ def extract_lesson_title_plain(text):
 
 # ─── Format A: Levels 1-4 ───
 
-def parse_dialogue_format_a(text):
+def section_text(text, sections, name):
+    """Body of a split_sections() section, or None if the lesson lacks it."""
+    span = sections.get(name)
+    return text[span[0]:span[1]] if span else None
+
+
+def parse_dialogue_format_a(text, sections=None):
     """Parse dialogue from format A PDFs (separate CN/PY/EN sections)."""
     dialogue = []
+    if sections is None:
+        sections = split_sections(text)
 
-    cn_match = re.search(r'SIMPLIFIED CHINESE\s*\n(.*?)(?:TRADITIONAL CHINESE|PINYIN)', text, re.DOTALL)
-    cn_lines = parse_numbered_lines(cn_match.group(1)) if cn_match else []
+    cn_text = section_text(text, sections, 'dialogue_cn')
+    cn_lines = parse_numbered_lines(cn_text) if cn_text is not None else []
 
-    py_match = re.search(r'PINYIN\s*\n(.*?)(?:ENGLISH)', text, re.DOTALL)
-    py_lines = parse_numbered_lines(py_match.group(1)) if py_match else []
+    py_text = section_text(text, sections, 'dialogue_pinyin')
+    py_lines = parse_numbered_lines(py_text) if py_text is not None else []
 
-    en_match = re.search(r'ENGLISH\s*\n(.*?)(?:VOCABULARY|$)', text, re.DOTALL)
-    en_lines = parse_numbered_lines(en_match.group(1)) if en_match else []
+    en_text = section_text(text, sections, 'dialogue_en')
+    en_lines = parse_numbered_lines(en_text) if en_text is not None else []
 
     max_lines = max(len(cn_lines), len(py_lines), len(en_lines))
     for i in range(max_lines):
@@ -292,18 +343,16 @@ def parse_numbered_inline(lines):
 
 # ─── Vocabulary & Sentences (shared) ───
 
-def parse_vocabulary(text):
+def parse_vocabulary(text, sections=None):
     """Extract vocabulary table entries."""
     vocab = []
+    if sections is None:
+        sections = split_sections(text)
 
-    vocab_match = re.search(
-        r'VOCABULARY\s*\n(.*?)(?:SAMPLE\s*SENTENCES|VOCABULARY\s*PHRASE\s*USAGE|GRAMMAR|CULTURAL\s*INSIGHT|$)',
-        text, re.DOTALL
-    )
-    if not vocab_match:
+    vocab_text = section_text(text, sections, 'vocabulary')
+    if vocab_text is None:
         return vocab
 
-    vocab_text = vocab_match.group(1)
     # Remove header row
     vocab_text = re.sub(r'Simpli[ﬁfi]ed\s+Traditional\s+Pinyin\s+English.*?\n', '', vocab_text)
 
@@ -358,18 +407,16 @@ def parse_vocabulary(text):
     return vocab
 
 
-def parse_sample_sentences(text):
+def parse_sample_sentences(text, sections=None):
     """Extract sample sentences."""
     sentences = []
+    if sections is None:
+        sections = split_sections(text)
 
-    ss_match = re.search(
-        r'SAMPLE\s*SENTENCES\s*\n(.*?)(?:VOCABULARY\s*PHRASE\s*USAGE|GRAMMAR|CULTURAL\s*INSIGHT|$)',
-        text, re.DOTALL
-    )
-    if not ss_match:
+    ss_text = section_text(text, sections, 'sample_sentences')
+    if ss_text is None:
         return sentences
 
-    ss_text = ss_match.group(1)
     lines = [l.strip() for l in ss_text.split('\n') if l.strip()]
 
     i = 0
@@ -422,40 +469,6 @@ def parse_sample_sentences(text):
     return sentences
 
 
-def has_chinese(text):
-    """Check if text contains Chinese characters (including CJK compat range)."""
-    for char in text:
-        cp = ord(char)
-        if (0x4E00 <= cp <= 0x9FFF or  # CJK Unified
-            0x3400 <= cp <= 0x4DBF or  # CJK Extension A
-            0x2E80 <= cp <= 0x2EFF or  # CJK Radicals Supplement
-            0x2F00 <= cp <= 0x2FDF or  # Kangxi Radicals
-            0xF900 <= cp <= 0xFAFF):   # CJK Compatibility
-            return True
-    return False
-
-
-def is_pinyin(text):
-    """Check if text looks like pinyin."""
-    tone_chars = 'āáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜ'
-    if any(c in text for c in tone_chars):
-        return True
-    if re.match(r'^[A-Z][a-z]', text) and not has_chinese(text) and len(text) > 3:
-        pinyin_syllables = ['shi', 'zhi', 'chi', 'de', 'le', 'ma', 'ne',
-                           'jiào', 'shénme', 'míng', 'wèi', 'fáng', 'zuò']
-        text_lower = text.lower()
-        for s in pinyin_syllables:
-            if s in text_lower:
-                return True
-    return False
-
-
-def is_pinyin_like(text):
-    """Looser check for pinyin tone marks."""
-    tone_chars = 'āáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜ'
-    return any(c in text for c in tone_chars)
-
-
 def split_pinyin_english(text):
     """Split concatenated pinyin+English text (e.g. 'Nǐhǎo. Hello.' -> ('Nǐhǎo.', 'Hello.'))"""
     if not text:
@@ -509,21 +522,6 @@ def split_pinyin_english(text):
     return text, ""
 
 
-def strip_leaked_headers(text):
-    """Remove leaked PDF page headers from any text field."""
-    if not text:
-        return text
-    # Match any variation of level headers (with irregular spacing from PDF extraction)
-    # Pattern: UPPER/LOWER/ABS + level name + S1/S2 + #number + rest of title
-    text = re.sub(r'\s*(?:ABS\s*OLUTE\s+)?(?:UPPER\s+)?(?:LOWER\s+)?(?:BEGI\s*NNER|I\s*NTERMEDI\s*ATE|ELEMENTARY)\s+S(?:EASON)?\s*\d.*$', '', text, flags=re.IGNORECASE).strip()
-    # Catch clean versions too
-    text = re.sub(r'\s*(?:ABSOLUTE BEGINNER|UPPER BEGINNER|LOWER BEGINNER|BEGINNER|ELEMENTARY|LOWER INTERMEDIATE|INTERMEDIATE|UPPER INTERMEDIATE)\s+S(?:EASON)?\s*\d.*$', '', text, flags=re.IGNORECASE).strip()
-    # Strip site name and lesson reference headers
-    text = re.sub(r'\s*CHINESECLASS101\.COM.*$', '', text).strip()
-    text = re.sub(r'\s*GENGO\s+CHI\s*NES\s*E\s+S\s*\d.*$', '', text).strip()
-    return text
-
-
 def post_process_cards(result):
     """Post-process all cards: split concatenated pinyin+English, strip headers."""
     for card_type in ['vocab', 'sentences', 'dialogue']:
@@ -554,30 +552,48 @@ def post_process_cards(result):
     return result
 
 
-def process_lesson_pdf(pdf_path, level_num, lesson_num):
-    """Process a single lesson PDF and extract all learning cards."""
-    # Get both dict-mode lines and plain text
-    dict_lines = extract_text_dict(pdf_path)
-    plain_text = extract_text_plain(pdf_path)
-    cleaned_text = clean_text(plain_text)
+def process_lesson_pdf(pdf_path, level_num, lesson_num, profile=NULL_PROFILE):
+    """Process a single lesson PDF and extract all learning cards.
+
+    Pass a LessonProfile to record per-stage wall time and sizes.
+    """
+    # Classifier results are memoized per line; start each lesson fresh
+    clear_classifier_cache()
+
+    # Get plain text for every page, and dict-mode lines only where they are read
+    with profile.stage("extract") as stage:
+        dict_lines, plain_text = extract_text(pdf_path, full_layout=False)
+        stage["lines"] = len(dict_lines)
+        stage["chars"] = len(plain_text)
+    with profile.stage("clean"):
+        cleaned_text = clean_text(plain_text)
+    # One scan finds the dialogue, vocabulary and sample-sentence sections
+    with profile.stage("sections"):
+        sections = split_sections(cleaned_text)
 
     # Detect format
-    fmt = detect_pdf_format(dict_lines)
+    with profile.stage("detect"):
+        fmt = detect_pdf_format(dict_lines)
 
     # Title
-    title = extract_lesson_title_from_lines(dict_lines)
-    if not title:
-        title = extract_lesson_title_plain(plain_text)
+    with profile.stage("title"):
+        title = extract_lesson_title_from_lines(dict_lines)
+        if not title:
+            title = extract_lesson_title_plain(plain_text)
 
     # Dialogue
-    if fmt == 'B':
-        dialogue = parse_dialogue_format_b(dict_lines)
-    else:
-        dialogue = parse_dialogue_format_a(cleaned_text)
+    with profile.stage("dialogue") as stage:
+        if fmt == 'B':
+            dialogue = parse_dialogue_format_b(dict_lines)
+        else:
+            dialogue = parse_dialogue_format_a(cleaned_text, sections)
+        stage["format"] = fmt
 
     # Vocabulary and sentences (work from cleaned plain text for both formats)
-    vocab = parse_vocabulary(cleaned_text)
-    sentences = parse_sample_sentences(cleaned_text)
+    with profile.stage("vocabulary"):
+        vocab = parse_vocabulary(cleaned_text, sections)
+    with profile.stage("sentences"):
+        sentences = parse_sample_sentences(cleaned_text, sections)
 
     lesson_id = f"L{level_num}-{lesson_num:03d}"
 
@@ -601,64 +617,273 @@ def process_lesson_pdf(pdf_path, level_num, lesson_num):
         result["dialogue"].append(d)
 
     # Post-process: split concatenated pinyin+English, strip headers
-    post_process_cards(result)
+    with profile.stage("post") as stage:
+        post_process_cards(result)
+        stage["cards"] = len(vocab) + len(sentences) + len(dialogue)
 
     return lesson_id, result
 
 
-def main():
-    all_cards = {}
-    stats = {"levels": {}, "total_vocab": 0, "total_sentences": 0, "total_dialogue": 0, "total_lessons": 0}
-
-    for level_num in range(1, 6):
-        level_dir = RESOURCES_DIR / f"level-{level_num}" / "materials"
-        if not level_dir.exists():
-            print(f"  Skipping level {level_num} (no materials directory)")
-            continue
-
-        level_stats = {"lessons": 0, "vocab": 0, "sentences": 0, "dialogue": 0}
-        lesson_pdfs = sorted(level_dir.glob("*-lesson.pdf"))
-
-        for pdf_path in lesson_pdfs:
-            num_match = re.match(r'(\d+)-lesson\.pdf', pdf_path.name)
-            if not num_match:
+def list_input_files(source):
+    """Yield (relative posix path, pdf_path) for every file in a directory or zip archive."""
+    source = Path(source)
+    if source.is_dir():
+        for path in sorted(source.rglob('*')):
+            if path.is_file():
+                yield path.relative_to(source).as_posix(), path
+    else:
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    yield info.filename, ZipMember(source, info.filename)
+
+
+def find_lesson_pdfs(inputs=(RESOURCES_DIR,), pattern=LESSON_PATTERN):
+    """Group lesson PDFs by level as [(level_num, [(level_num, lesson_num, pdf_path), ...])].
+
+    pdf_path is a Path, or a ZipMember for lessons inside a zip archive.
+    When two files map to the same lesson ID, the first input wins.
+    """
+    lesson_re = re.compile(pattern)
+    found = {}
+    for source in inputs:
+        count = duplicates = 0
+        for rel_path, pdf_path in list_input_files(source):
+            match = lesson_re.search(rel_path)
+            if not match:
                 continue
+            key = (int(match.group('level')), int(match.group('lesson')))
+            if key in found:
+                duplicates += 1
+                continue
+            found[key] = pdf_path
+            count += 1
+        skipped = f" ({duplicates} duplicate lesson IDs skipped)" if duplicates else ""
+        print(f"  {source}: {count} lesson PDFs{skipped}")
+
+    levels = {}
+    for (level_num, lesson_num), pdf_path in sorted(found.items()):
+        levels.setdefault(level_num, []).append((level_num, lesson_num, pdf_path))
+    return list(levels.items())
+
+
+# ─── Incremental cache ───
+
+def parser_fingerprint():
+    """Hash the parser sources so cached results are tied to the code that made them."""
+    h = hashlib.sha256()
+    for path in PARSER_SOURCES:
+        h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+
+def cache_entry_path(cache_dir, lesson_id, pdf_path, fingerprint):
+    """Cache file for a lesson, keyed by PDF content hash plus parser fingerprint."""
+    h = hashlib.sha256(pdf_path.read_bytes())
+    h.update(fingerprint.encode())
+    return cache_dir / f"{lesson_id}-{h.hexdigest()[:24]}.json"
+
+
+def load_cached_lesson(entry_path):
+    """Return cached cards for a lesson, or None on a miss or unreadable entry."""
+    try:
+        with open(entry_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_cached_lesson(entry_path, lesson_id, cards):
+    """Write a cache entry atomically and drop stale entries for the same lesson."""
+    entry_path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in entry_path.parent.glob(f"{lesson_id}-*.json"):
+        if stale != entry_path:
+            stale.unlink(missing_ok=True)
+    tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cards, f, ensure_ascii=False)
+    os.replace(tmp_path, entry_path)
+
+
+def run_lesson_task(task, cache_dir=None, fingerprint=None, force=False, profile=False):
+    """Worker entry point: process one lesson, returning (cards, cache_hit, error, traceback, profile).
+
+    With a cache_dir, unchanged lessons are served from cache; --force skips
+    the lookup but still refreshes the entry. With profile, the last item is
+    the lesson's LessonProfile.as_dict(), otherwise None.
+    """
+    level_num, lesson_num, pdf_path = task
+    lesson_id = f"L{level_num}-{lesson_num:03d}"
+    try:
+        entry_path = None
+        if cache_dir is not None:
+            entry_path = cache_entry_path(cache_dir, lesson_id, pdf_path, fingerprint)
+            cards = None if force else load_cached_lesson(entry_path)
+            if cards is not None:
+                return cards, True, None, None, None
+
+        lesson_profile = LessonProfile(lesson_id) if profile else NULL_PROFILE
+        _, cards = process_lesson_pdf(pdf_path, level_num, lesson_num, lesson_profile)
+        if entry_path is not None:
+            store_cached_lesson(entry_path, lesson_id, cards)
+        return cards, False, None, None, lesson_profile.as_dict() if profile else None
+    except Exception as e:
+        return None, False, str(e), traceback.format_exc(), None
+
+
+def resumable_lessons(resume_path, lesson_ids):
+    """IDs of the lessons a partial output can replay for a run over lesson_ids (in order).
+
+    The partial file is replayed as a stream, so it is only trusted while its
+    lessons come in the order this run asks for them. From the first lesson
+    out of place (a PDF added, renamed or reordered since), the rest are
+    extracted again.
+    """
+    wanted = set(lesson_ids)
+    written = [lesson_id for lesson_id, _ in read_partial_lessons(resume_path) if lesson_id in wanted]
+    written_set = set(written)
+    expected = [lesson_id for lesson_id in lesson_ids if lesson_id in written_set]
+    n = 0
+    while n < len(written) and written[n] == expected[n]:
+        n += 1
+    return set(written[:n])
+
+
+def run_lesson_tasks(tasks, jobs, **cache_options):
+    """Yield results for tasks in submission order, using a process pool when jobs > 1."""
+    worker = partial(run_lesson_task, **cache_options)
+    if jobs <= 1:
+        yield from map(worker, tasks)
+        return
+    from concurrent.futures import ProcessPoolExecutor  # only needed with --jobs
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(worker, tasks)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract learning cards from lesson PDFs.")
+    parser.add_argument('inputs', nargs='*', type=Path, default=[RESOURCES_DIR], metavar='INPUT',
+                        help=f"directories or zip archives of lesson PDFs (default: {RESOURCES_DIR})")
+    parser.add_argument('--lesson-pattern', default=LESSON_PATTERN, metavar='REGEX',
+                        help="regex matched against each file's path inside an input; named groups "
+                             "'level' and 'lesson' give the lesson ID (default: %(default)s)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="worker processes for PDF parsing (default: 1, 0 = one per CPU)")
+    parser.add_argument('--force', action='store_true',
+                        help="re-parse every PDF, ignoring cached results")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"neither read nor write the lesson cache ({CACHE_DIR})")
+    parser.add_argument('--resume', action='store_true',
+                        help="reuse lessons already written by an interrupted run (not with --shards)")
+    parser.add_argument('--profile', action='store_true',
+                        help="time each parsing stage and print the slowest lessons (implies --force)")
+    parser.add_argument('--profile-top', type=int, default=15, metavar='N',
+                        help="lessons shown in the --profile report (default: 15)")
+    parser.add_argument('--profile-dump', type=Path, metavar='DIR',
+                        help="with --profile, re-run the slowest lessons under cProfile and write DIR/<lesson>.pstats")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    if args.profile_dump and not args.profile:
+        parser.error("--profile-dump requires --profile")
+    try:
+        groups = re.compile(args.lesson_pattern).groupindex
+    except re.error as e:
+        parser.error(f"--lesson-pattern: {e}")
+    if not {'level', 'lesson'} <= set(groups):
+        parser.error("--lesson-pattern needs named groups (?P<level>...) and (?P<lesson>...)")
+    for source in args.inputs:
+        if not source.is_dir() and not zipfile.is_zipfile(source):
+            parser.error(f"{source} is neither a directory nor a zip archive")
+    if args.resume and not args.monolithic:
+        # Shards are renamed into place one by one, so there is no partial
+        # file to resume from; the lesson cache makes a rerun cheap instead
+        parser.error("--resume only applies to monolithic output, not --shards")
+    return args
 
-            lesson_num = int(num_match.group(1))
-
-            try:
-                lesson_id, cards = process_lesson_pdf(pdf_path, level_num, lesson_num)
-                total_cards = len(cards["vocab"]) + len(cards["sentences"]) + len(cards["dialogue"])
-
-                if total_cards > 0:
-                    all_cards[lesson_id] = cards
-                    level_stats["lessons"] += 1
-                    level_stats["vocab"] += len(cards["vocab"])
-                    level_stats["sentences"] += len(cards["sentences"])
-                    level_stats["dialogue"] += len(cards["dialogue"])
-
-                    print(f"  L{level_num}-{lesson_num:03d}: {len(cards['vocab'])}V {len(cards['sentences'])}S {len(cards['dialogue'])}D = {total_cards} cards")
-                else:
-                    print(f"  L{level_num}-{lesson_num:03d}: (no extractable content)")
-
-            except Exception as e:
-                print(f"  L{level_num}-{lesson_num:03d}: ERROR - {e}")
-                import traceback
-                traceback.print_exc()
 
-        stats["levels"][f"level-{level_num}"] = level_stats
-        stats["total_vocab"] += level_stats["vocab"]
-        stats["total_sentences"] += level_stats["sentences"]
-        stats["total_dialogue"] += level_stats["dialogue"]
-        stats["total_lessons"] += level_stats["lessons"]
+def main():
+    args = parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
-        print(f"\nLevel {level_num}: {level_stats['lessons']} lessons, "
-              f"{level_stats['vocab']}V {level_stats['sentences']}S {level_stats['dialogue']}D")
+    stats = {"levels": {}, "total_vocab": 0, "total_sentences": 0, "total_dialogue": 0, "total_lessons": 0}
 
-    # Write output
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(all_cards, f, ensure_ascii=False, indent=2)
+    levels = find_lesson_pdfs(args.inputs, args.lesson_pattern)
+    all_tasks = [t for _, tasks in levels for t in tasks]
+    task_ids = [f"L{level_num}-{lesson_num:03d}" for level_num, lesson_num, _ in all_tasks]
+
+    # Lessons already written by an interrupted run are replayed from its
+    # partial output instead of being parsed again
+    resume_path = claim_partial_output(OUTPUT_FILE) if args.resume else None
+    resumed_ids = set()
+    if resume_path is not None:
+        resumed_ids = resumable_lessons(resume_path, task_ids)
+    resumed_lessons = (entry for entry in read_partial_lessons(resume_path) if entry[0] in resumed_ids) \
+        if resumed_ids else iter(())
+
+    # One flat task list keeps the pool busy across level boundaries; results
+    # come back in submission order, so output key order matches a serial run.
+    cache_dir = None if args.no_cache else CACHE_DIR
+    pending = [t for t in all_tasks if f"L{t[0]}-{t[1]:03d}" not in resumed_ids]
+    # Profiling measures parsing, so cached lessons are re-parsed too
+    results = run_lesson_tasks(pending, jobs, cache_dir=cache_dir, fingerprint=parser_fingerprint(),
+                               force=args.force or args.profile, profile=args.profile)
+    cache_hits = cache_misses = 0
+    profiles = []
+
+    try:
+        with card_writer(args, OUTPUT_FILE, "course-cards") as writer:
+            for level_num, tasks in levels:
+                level_stats = {"lessons": 0, "vocab": 0, "sentences": 0, "dialogue": 0}
+
+                for _, lesson_num, _ in tasks:
+                    lesson_id = f"L{level_num}-{lesson_num:03d}"
+                    if lesson_id in resumed_ids:
+                        replayed_id, cards = next(resumed_lessons)
+                        if replayed_id != lesson_id:
+                            raise RuntimeError(f"--resume out of step: expected {lesson_id}, "
+                                               f"{resume_path} has {replayed_id}")
+                    else:
+                        cards, cache_hit, error, tb, profile = next(results)
+                        if cache_hit:
+                            cache_hits += 1
+                        else:
+                            cache_misses += 1
+                        if profile is not None:
+                            profiles.append(profile)
+                        if error is not None:
+                            print(f"  {lesson_id}: ERROR - {error}")
+                            print(tb, end='', file=sys.stderr)
+                            continue
+
+                    total_cards = len(cards["vocab"]) + len(cards["sentences"]) + len(cards["dialogue"])
+
+                    if total_cards > 0:
+                        writer.write(lesson_id, cards)
+                        level_stats["lessons"] += 1
+                        level_stats["vocab"] += len(cards["vocab"])
+                        level_stats["sentences"] += len(cards["sentences"])
+                        level_stats["dialogue"] += len(cards["dialogue"])
+
+                        print(f"  {lesson_id}: {len(cards['vocab'])}V {len(cards['sentences'])}S {len(cards['dialogue'])}D = {total_cards} cards")
+                    else:
+                        print(f"  {lesson_id}: (no extractable content)")
+
+                stats["levels"][f"level-{level_num}"] = level_stats
+                stats["total_vocab"] += level_stats["vocab"]
+                stats["total_sentences"] += level_stats["sentences"]
+                stats["total_dialogue"] += level_stats["dialogue"]
+                stats["total_lessons"] += level_stats["lessons"]
+
+                print(f"\nLevel {level_num}: {level_stats['lessons']} lessons, "
+                      f"{level_stats['vocab']}V {level_stats['sentences']}S {level_stats['dialogue']}D")
+    except BaseException:
+        if args.monolithic:
+            print(f"\nInterrupted: finished lessons kept in {partial_path(OUTPUT_FILE)} (rerun with --resume)",
+                  file=sys.stderr)
+        raise
+
+    if resume_path is not None:
+        resume_path.unlink(missing_ok=True)
 
     total_cards = stats["total_vocab"] + stats["total_sentences"] + stats["total_dialogue"]
     print(f"\n{'='*60}")
@@ -666,7 +891,23 @@ def main():
     print(f"  Vocabulary: {stats['total_vocab']}")
     print(f"  Sentences:  {stats['total_sentences']}")
     print(f"  Dialogue:   {stats['total_dialogue']}")
-    print(f"\nOutput: {OUTPUT_FILE}")
+    if cache_dir is not None:
+        print(f"  Cache:      {cache_hits} hits, {cache_misses} misses ({cache_dir})")
+    if resumed_ids:
+        print(f"  Resumed:    {len(resumed_ids)} lessons from {resume_path}")
+    print(f"\nOutput: {output_location(args, OUTPUT_FILE)}")
+
+    if args.profile:
+        print_profile_report(profiles, args.profile_top)
+    if args.profile_dump:
+        tasks_by_id = {f"L{t[0]}-{t[1]:03d}": t for t in pending}
+        print(f"\ncProfile dumps ({args.profile_dump}):")
+        for profile in sorted(profiles, key=lambda p: -p["seconds"])[:args.profile_top]:
+            level_num, lesson_num, pdf_path = tasks_by_id[profile["lesson_id"]]
+            dump_path = args.profile_dump / f"{profile['lesson_id']}.pstats"
+            dump_cprofile(partial(process_lesson_pdf, pdf_path, level_num, lesson_num), dump_path)
+            print(f"  {dump_path}")
+        print("  (inspect with: python3 -m pstats <file>)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Give every staged resource a content-fingerprinted file name.
+
+nginx serves /resources/ with "Cache-Control: public, immutable" and a
+30-day expiry, which is only safe if a file's URL changes whenever its
+bytes do. This stage hashes every file under resources/ (as staged by
+stage-resources.py) and places it in resources-dist/ under a name
+carrying the first 12 hex digits of its SHA-256:
+
+  courses/level-1/audio/006-meeting-time-for-class.mp3
+    -> courses/level-1/audio/006-meeting-time-for-class.3f9c0a1b2d4e.mp3
+
+Files are hardlinked into resources-dist/ where possible, the same way
+stage-resources.py places them. It then:
+  - writes src/data/resource-manifest.json, mapping each logical path to
+    its hashed path, size and full SHA-256
+  - rewrites audioPath in courses.json and path in library.json to the
+    hashed paths (a path that is already hashed is mapped back to its
+    logical name first, so running the stage again is safe)
+  - removes files from resources-dist/ that no longer appear in the manifest
+
+Hashes are cached in .cache/resource-hashes.json by size and mtime, so a
+file is only read again after it changes. Upload resources-dist/, not
+resources/. Run this after build-catalog.py, which writes logical paths.
+
+Usage:
+  python3 fingerprint-resources.py [--resources resources] [--dist resources-dist]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from card_output import dump_pretty, write_atomic
+from course_catalog import COURSES_FILE, update_catalog
+from resource_layout import file_sha256, hashed_path, load_json, logical_path, map_catalog_paths
+from script_loader import load_script
+
+RESOURCES_DIR = Path("resources")
+DIST_DIR = Path("resources-dist")
+MANIFEST_FILE = Path("src/data/resource-manifest.json")
+LIBRARY_FILE = Path("src/data/library.json")
+HASH_CACHE_FILE = Path(".cache/resource-hashes.json")
+FORMAT_NAME = "famlingo-resources"
+FORMAT_VERSION = 1
+
+
+def list_resources(resources_dir):
+    """Relative POSIX paths of every staged file, skipping dotfiles (temp files of a running stage)."""
+    paths = []
+    for root, dirs, files in os.walk(resources_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        paths.extend(Path(root, name).relative_to(resources_dir).as_posix()
+                     for name in sorted(files) if not name.startswith("."))
+    return paths
+
+
+def hash_resources(resources_dir, paths, cache, jobs):
+    """{logical path: (size, sha256)}; files whose size and mtime match the cache are not read."""
+    def one(path):
+        st = (resources_dir / path).stat()
+        cached = cache.get(path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return path, st, cached["sha256"], False
+        return path, st, file_sha256(resources_dir / path), True
+
+    hashes = {}
+    new_cache = {}
+    n_hashed = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for path, st, sha256, hashed in pool.map(one, paths):
+            hashes[path] = (st.st_size, sha256)
+            new_cache[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+            n_hashed += hashed
+    return hashes, new_cache, n_hashed
+
+
+def build_manifest(hashes):
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "files": {path: {"path": hashed_path(path, sha256), "size": size, "sha256": sha256}
+                  for path, (size, sha256) in sorted(hashes.items())},
+    }
+
+
+def fingerprinted(files, missing):
+    """map_catalog_paths() callback: a catalog path's hashed name, noting paths with no staged file."""
+    def fn(path):
+        entry = files.get(logical_path(path))
+        if entry is None:
+            missing.append(path)
+            return path
+        return entry["path"]
+    return fn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint staged resources and point the catalogs at them.")
+    parser.add_argument('--resources', type=Path, default=RESOURCES_DIR,
+                        help=f"staged resources (default: {RESOURCES_DIR})")
+    parser.add_argument('--dist', type=Path, default=DIST_DIR,
+                        help=f"fingerprinted output tree to upload (default: {DIST_DIR})")
+    parser.add_argument('--manifest', type=Path, default=MANIFEST_FILE, help=f"manifest (default: {MANIFEST_FILE})")
+    parser.add_argument('--courses', type=Path, default=COURSES_FILE, help=f"courses catalog (default: {COURSES_FILE})")
+    parser.add_argument('--library', type=Path, default=LIBRARY_FILE, help=f"library catalog (default: {LIBRARY_FILE})")
+    parser.add_argument('--mode', choices=("auto", "link", "reflink", "copy"), default="auto",
+                        help="how files are placed in --dist, as in stage-resources.py (default: auto)")
+    parser.add_argument('--jobs', type=int, default=min(8, os.cpu_count() or 1), help="parallel file operations")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = list_resources(args.resources)
+    if not paths:
+        print(f"ERROR: no staged files in {args.resources} (run stage-resources.py first)")
+        return 1
+
+    cache = load_json(HASH_CACHE_FILE, {})
+    hashes, new_cache, n_hashed = hash_resources(args.resources, paths, cache, args.jobs)
+    write_atomic(HASH_CACHE_FILE, json.dumps(new_cache).encode('utf-8'))
+    manifest = build_manifest(hashes)
+    files = manifest["files"]
+
+    # A hashed name only ever holds one content, so an existing file of the right size is done
+    stager = load_script("stage-resources.py")
+
+    def place(path):
+        dest = args.dist / files[path]["path"]
+        if dest.is_file() and dest.stat().st_size == files[path]["size"]:
+            return False
+        source = args.resources / path
+        stager.place(source, dest, source.stat(), args.mode)
+        return True
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        n_placed = sum(pool.map(place, files))
+    removed = stager.remove_stale(args.dist, {entry["path"] for entry in files.values()}, dry_run=False)
+
+    write_atomic(args.manifest, dump_pretty(manifest).encode('utf-8'))
+    missing = []
+    rewritten = {}
+    for catalog_path in (args.courses, args.library):
+        rewritten[catalog_path] = update_catalog(
+            lambda catalog: map_catalog_paths(catalog, fingerprinted(files, missing)), catalog_path)
+
+    total_bytes = sum(entry["size"] for entry in files.values())
+    print(f"{len(files)} files ({total_bytes:,} bytes): {n_hashed} hashed, {len(files) - n_hashed} from cache")
+    print(f"{args.dist}: {n_placed} placed, {len(files) - n_placed} already there, {len(removed)} removed")
+    for catalog_path, n in rewritten.items():
+        print(f"{catalog_path}: {n} paths rewritten")
+    for path in missing:
+        print(f"  WARNING: catalog path with no staged file: {path}")
+    print(f"Manifest: {args.manifest} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
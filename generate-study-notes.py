@@ -3,9 +3,17 @@
 Generate study-notes-cards.json from the PDF content structure.
 Since the PDF CJK characters are garbled, we use the English definitions
 extracted from the PDF and pair them with the correct Chinese + pinyin.
+
+Writes the single card file by default; pass --shards for per-lesson shards.
 """
 
-import json
+import argparse
+
+from card_output import add_output_arguments, card_writer, output_location
+
+parser = argparse.ArgumentParser(description="Generate study-notes cards.")
+add_output_arguments(parser)
+args = parser.parse_args()
 
 study_notes = {}
 
@@ -680,10 +688,11 @@ study_notes.update(challenge_days)
 
 # Write output
 output_path = "src/data/study-notes-cards.json"
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(study_notes, f, ensure_ascii=False, indent=2)
+with card_writer(args, output_path, "study-notes") as writer:
+    for lesson_id, lesson in study_notes.items():
+        writer.write(lesson_id, lesson)
 
-print(f"Generated {output_path}")
+print(f"Generated {output_location(args, output_path)}")
 print(f"  Chapters: {sum(1 for k in study_notes if k.startswith('SN-') and not k.startswith('SN-DC'))}")
 print(f"  Challenge days: {sum(1 for k in study_notes if k.startswith('SN-DC'))}")
 total_vocab = sum(len(ch.get('vocab', [])) for ch in study_notes.values())
@@ -2,12 +2,19 @@
 """
 Generate vocabulary group cards from pages 2-21 of the PDF.
 These are well-structured topic-based vocab lists with clean Chinese characters.
-Output: src/data/vocab-groups-cards.json
-Also updates courses.json to prepend these lessons to the study-notes level.
+Output: src/data/vocab-groups-cards.json, or per-lesson shards with --shards
+Also puts these lessons first in the study-notes level of courses.json,
+replacing the ones a previous run added (safe to re-run).
 """
 
-import json
-import os
+import argparse
+
+from card_output import add_output_arguments, card_writer, output_location
+from course_catalog import COURSES_FILE, find_level, replace_lessons, update_catalog
+
+parser = argparse.ArgumentParser(description="Generate vocabulary group cards.")
+add_output_arguments(parser)
+args = parser.parse_args()
 
 # Each group is a lesson with vocab and sentences extracted from the PDF pages.
 # The Chinese characters extract cleanly from these pages (unlike later chapters).
@@ -447,46 +454,26 @@ print(f"Total: {total_vocab} vocab cards + {total_sentences} sentence cards = {t
 
 # Write cards JSON
 cards_path = "src/data/vocab-groups-cards.json"
-with open(cards_path, "w", encoding="utf-8") as f:
-    json.dump(vocab_groups, f, ensure_ascii=False, indent=2)
-print(f"Written to {cards_path}")
-
-# Now update courses.json to add vocab group lessons to the study-notes level
-courses_path = "src/data/courses.json"
-with open(courses_path, "r", encoding="utf-8") as f:
-    courses = json.load(f)
-
-# Find the study-notes level
-sn_level = None
-for level in courses["levels"]:
-    if level["id"] == "study-notes":
-        sn_level = level
-        break
-
-if sn_level:
-    # Build new lesson entries for vocab groups (prepend before existing lessons)
-    vg_lessons = []
-    order = 1
-    for lesson_id, data in vocab_groups.items():
-        vg_lessons.append({
-            "id": lesson_id,
-            "title": data["lessonTitle"],
-            "order": order
-        })
-        order += 1
+with card_writer(args, cards_path, "vocab-groups") as writer:
+    for lesson_id, lesson in vocab_groups.items():
+        writer.write(lesson_id, lesson)
+print(f"Written to {output_location(args, cards_path)}")
 
-    # Re-number existing lessons
-    existing_lessons = sn_level.get("lessons", [])
-    for ls in existing_lessons:
-        ls["order"] = order
-        order += 1
 
-    # Prepend vocab groups
-    sn_level["lessons"] = vg_lessons + existing_lessons
+# Now put the vocab group lessons at the front of the study-notes level,
+# replacing the SN-VG* entries of any earlier run
+def add_vocab_group_lessons(courses):
+    sn_level = find_level(courses, "study-notes")
+    if sn_level is None:
+        return None
+    vg_lessons = [{"id": lesson_id, "title": data["lessonTitle"]} for lesson_id, data in vocab_groups.items()]
+    added, replaced = replace_lessons(sn_level, "SN-VG", vg_lessons)
+    return added, replaced, len(sn_level["lessons"])
 
-    with open(courses_path, "w", encoding="utf-8") as f:
-        json.dump(courses, f, ensure_ascii=False, indent=2)
 
-    print(f"Updated {courses_path}: added {len(vg_lessons)} vocab group lessons (total: {len(sn_level['lessons'])} lessons)")
+counts = update_catalog(add_vocab_group_lessons, COURSES_FILE)
+if counts:
+    added, replaced, total = counts
+    print(f"Updated {COURSES_FILE}: {added} vocab group lessons ({replaced} replaced, total: {total} lessons)")
 else:
-    print("ERROR: study-notes level not found in courses.json")
+    print(f"ERROR: study-notes level not found in {COURSES_FILE}")
@@ -0,0 +1,103 @@
+"""
+Per-stage profiling for extract-lesson-cards.py --profile.
+
+process_lesson_pdf() wraps each step in profile.stage(name); the yielded
+dict is the stage's record, so the step can add what it processed (lines,
+characters, cards) next to the wall time. Without --profile it gets
+NULL_PROFILE, whose stages record nothing.
+
+Records are plain dicts so they pickle back from worker processes. The
+first lesson in each process also pays for importing PyMuPDF and building
+the CJK tables, so it tends to top the slowest-lessons table.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class LessonProfile:
+    """Stage timings and sizes for one lesson."""
+
+    def __init__(self, lesson_id):
+        self.lesson_id = lesson_id
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        record = {"stage": name}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            self.stages.append(record)
+
+    def as_dict(self):
+        return {
+            "lesson_id": self.lesson_id,
+            "seconds": sum(s["seconds"] for s in self.stages),
+            "stages": self.stages,
+        }
+
+
+class NullProfile:
+    """Stand-in used when profiling is off: stages run untimed."""
+
+    @contextmanager
+    def stage(self, name):
+        yield {}
+
+
+NULL_PROFILE = NullProfile()
+
+
+def stage_totals(profile):
+    """{stage: seconds} for one lesson's as_dict() output."""
+    totals = {}
+    for record in profile["stages"]:
+        totals[record["stage"]] = totals.get(record["stage"], 0.0) + record["seconds"]
+    return totals
+
+
+def print_profile_report(profiles, top=15):
+    """Print the slowest lessons with their per-stage breakdown, then corpus-wide stage totals."""
+    if not profiles:
+        print("\nProfile: no lessons were parsed (all served from cache or resumed)")
+        return
+
+    stages = []
+    for profile in profiles:
+        stages.extend(s for s in stage_totals(profile) if s not in stages)
+
+    slowest = sorted(profiles, key=lambda p: -p["seconds"])[:top]
+    print(f"\n{'='*60}")
+    print(f"PROFILE: {len(slowest)} slowest of {len(profiles)} lessons (ms)")
+    print(f"{'Lesson':<8} {'total':>8} " + ' '.join(f"{s[:10]:>10}" for s in stages)
+          + f" {'lines':>6} {'chars':>8} {'cards':>5}")
+    for profile in slowest:
+        totals = stage_totals(profile)
+        sizes = {}
+        for record in profile["stages"]:
+            sizes.update((k, v) for k, v in record.items() if k not in ("stage", "seconds"))
+        print(f"{profile['lesson_id']:<8} {profile['seconds'] * 1000:>8.1f} "
+              + ' '.join(f"{totals.get(s, 0.0) * 1000:>10.1f}" for s in stages)
+              + f" {sizes.get('lines', 0):>6} {sizes.get('chars', 0):>8} {sizes.get('cards', 0):>5}")
+
+    corpus = {s: 0.0 for s in stages}
+    for profile in profiles:
+        for stage, seconds in stage_totals(profile).items():
+            corpus[stage] += seconds
+    total = sum(corpus.values()) or 1.0
+    print(f"\n{'Stage':<14} {'total ms':>10} {'share':>7}")
+    for stage, seconds in sorted(corpus.items(), key=lambda item: -item[1]):
+        print(f"{stage:<14} {seconds * 1000:>10.1f} {seconds / total:>7.1%}")
+
+
+def dump_cprofile(fn, path):
+    """Run fn() under cProfile and save the stats to path for pstats / snakeviz."""
+    import cProfile  # only needed with --profile-dump
+
+    profiler = cProfile.Profile()
+    profiler.runcall(fn)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(path)
@@ -0,0 +1,277 @@
+"""
+Text cleaning for lesson PDF extraction.
+
+Shared by extract-lesson-cards.py and its tooling. Every regex is compiled
+once at import, and the per-character fixes (Level 5 \\x01 separators, CJK
+compatibility forms, ligatures) are folded into one str.translate table
+instead of a Python loop plus chained str.replace calls. Importing this
+module stays cheap: the CJK tables are only built on first use.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+
+# Manual mappings for CJK radicals without decomposition -> standard simplified Chinese
+MANUAL_CJK_MAP = {
+    '\u2EA0': '\u6C11',  # ⺠ -> 民 (CIVILIAN)
+    '\u2EC4': '\u897F',  # ⻄ -> 西 (WEST)
+    '\u2EC5': '\u89C1',  # ⻅ -> 见 (SEE)
+    '\u2EC9': '\u8D1D',  # ⻉ -> 贝 (SHELL)
+    '\u2ECB': '\u8F66',  # ⻋ -> 车 (CART)
+    '\u2ED1': '\u957F',  # ⻑ -> 长 (LONG ONE)
+    '\u2ED3': '\u957F',  # ⻓ -> 长 (LONG)
+    '\u2EDA': '\u9875',  # ⻚ -> 页 (LEAF/PAGE)
+    '\u2EDB': '\u98CE',  # ⻛ -> 风 (WIND)
+    '\u2EDD': '\u98DF',  # ⻝ -> 食 (EAT)
+    '\u2EE2': '\u9A6C',  # ⻢ -> 马 (HORSE)
+    '\u2EE5': '\u9C7C',  # ⻥ -> 鱼 (FISH)
+    '\u2EE8': '\u9EA6',  # ⻨ -> 麦 (WHEAT)
+    '\u2EE9': '\u9EC4',  # ⻩ -> 黄 (YELLOW)
+    '\u2EEC': '\u9F50',  # ⻬ -> 齐 (EVEN)
+    '\u2EF0': '\u9F99',  # ⻰ -> 龙 (DRAGON)
+    '\u2E9F': '\u6BCD',  # ⺟ -> 母 (MOTHER)
+}
+
+LIGATURE_MAP = {'ﬁ': 'fi', 'ﬂ': 'fl', 'ﬀ': 'ff', 'ﬃ': 'ffi', 'ﬄ': 'ffl'}
+
+
+# The compatibility map walks ~700 code points through unicodedata, so it
+# is built on first use rather than at import.
+@lru_cache(maxsize=None)
+def cjk_compat_map():
+    """Mapping from CJK compatibility forms to standard forms."""
+    mapping = {}
+    # CJK Radicals Supplement (2E80-2EFF), Kangxi Radicals (2F00-2FDF)
+    # and CJK Compatibility Ideographs (F900-FAFF)
+    for cp in list(range(0x2E80, 0x2FE0)) + list(range(0xF900, 0xFB00)):
+        char = chr(cp)
+        decomp = unicodedata.decomposition(char)
+        if decomp:
+            parts = decomp.split()
+            # Take the last codepoint as the standard form
+            try:
+                mapping[char] = chr(int(parts[-1], 16))
+            except (ValueError, IndexError):
+                pass
+    mapping.update(MANUAL_CJK_MAP)
+    return mapping
+
+
+@lru_cache(maxsize=None)
+def cjk_table():
+    """str.translate table for fix_cjk_compat."""
+    return str.maketrans(cjk_compat_map())
+
+
+@lru_cache(maxsize=None)
+def clean_table():
+    """str.translate table applying the \\x01 separator, CJK and ligature fixes at once.
+
+    None of these maps feed each other (separator -> space, CJK -> CJK,
+    ligature -> ASCII), so one translate pass equals applying them in turn.
+    """
+    return str.maketrans({'\x01': ' ', **cjk_compat_map(), **LIGATURE_MAP})
+
+MULTI_SPACE_RE = re.compile(r'  +')
+# Also covers the unspaced CHINESECLASS101.COM form (every \s* may be empty)
+SITE_HEADER_RE = re.compile(r'CHI\s*NES\s*ECLAS\s*S\s*101\.COM.*?\n')
+PAGE_NUMBER_RE = re.compile(r'^\d+\s*$', re.MULTILINE)
+CONTD_RE = re.compile(r"CONT'D OVER\s*")
+LEVEL_HEADER_RE = re.compile(
+    r'(?:ABSOLUTE BEGINNER|BEGINNER|ELEMENTARY|LOWER INTERMEDIATE|INTERMEDIATE|UPPER INTERMEDIATE)'
+    r'\s+(?:S\d+|SEASON)\s+(?:S\d+\s+)?#\d+'
+)
+
+# strip_leaked_headers: any variation of level headers (with irregular spacing
+# from PDF extraction), then clean versions, then site name / lesson references
+LEAKED_HEADER_RES = [
+    re.compile(r'\s*(?:ABS\s*OLUTE\s+)?(?:UPPER\s+)?(?:LOWER\s+)?(?:BEGI\s*NNER|I\s*NTERMEDI\s*ATE|ELEMENTARY)\s+S(?:EASON)?\s*\d.*$', re.IGNORECASE),
+    re.compile(r'\s*(?:ABSOLUTE BEGINNER|UPPER BEGINNER|LOWER BEGINNER|BEGINNER|ELEMENTARY|LOWER INTERMEDIATE|INTERMEDIATE|UPPER INTERMEDIATE)\s+S(?:EASON)?\s*\d.*$', re.IGNORECASE),
+    re.compile(r'\s*CHINESECLASS101\.COM.*$'),
+    re.compile(r'\s*GENGO\s+CHI\s*NES\s*E\s+S\s*\d.*$'),
+]
+
+
+def fix_cjk_compat(text):
+    """Replace CJK compatibility ideographs with standard forms."""
+    return text.translate(cjk_table())
+
+
+def clean_line(line):
+    """Clean a single line: remove control chars, fix CJK, normalize spaces."""
+    return MULTI_SPACE_RE.sub(' ', line.translate(clean_table())).strip()
+
+
+def clean_text(text):
+    """Clean full extracted text."""
+    text = SITE_HEADER_RE.sub('\n', text)
+    text = PAGE_NUMBER_RE.sub('', text)
+    text = CONTD_RE.sub('', text)
+    # Separators are translated only after the page-number pass, as before:
+    # a line like "12\x01" must not turn into a bare page number
+    text = text.translate(clean_table())
+    # Remove level header lines that leak into content
+    return LEVEL_HEADER_RE.sub('', text)
+
+
+def strip_leaked_headers(text):
+    """Remove leaked PDF page headers from any text field."""
+    if not text:
+        return text
+    for pattern in LEAKED_HEADER_RES:
+        text = pattern.sub('', text).strip()
+    return text
+
+
+# ─── Line classifiers ───
+#
+# The vocabulary and sentence parsers look at the same line several times
+# while scanning ahead, so results are memoized. The caches are bounded for
+# other importers (card_search, card_words, check-lesson-text), and
+# process_lesson_pdf also clears them per lesson.
+
+CHINESE_RE = re.compile(
+    r'[\u4E00-\u9FFF'   # CJK Unified
+    r'\u3400-\u4DBF'    # CJK Extension A
+    r'\u2E80-\u2EFF'    # CJK Radicals Supplement
+    r'\u2F00-\u2FDF'    # Kangxi Radicals
+    r'\uF900-\uFAFF]'   # CJK Compatibility
+)
+CLASSIFIER_CACHE_SIZE = 4096
+TONE_MARK_RE = re.compile('[āáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜ]')
+CAPITALIZED_RE = re.compile(r'[A-Z][a-z]')
+PINYIN_SYLLABLE_RE = re.compile('|'.join([
+    'shi', 'zhi', 'chi', 'de', 'le', 'ma', 'ne',
+    'jiào', 'shénme', 'míng', 'wèi', 'fáng', 'zuò',
+]))
+
+
+@lru_cache(maxsize=CLASSIFIER_CACHE_SIZE)
+def has_chinese(text):
+    """Check if text contains Chinese characters (including CJK compat range)."""
+    return CHINESE_RE.search(text) is not None
+
+
+@lru_cache(maxsize=CLASSIFIER_CACHE_SIZE)
+def is_pinyin(text):
+    """Check if text looks like pinyin."""
+    if TONE_MARK_RE.search(text):
+        return True
+    if CAPITALIZED_RE.match(text) and not has_chinese(text) and len(text) > 3:
+        return PINYIN_SYLLABLE_RE.search(text.lower()) is not None
+    return False
+
+
+@lru_cache(maxsize=CLASSIFIER_CACHE_SIZE)
+def is_pinyin_like(text):
+    """Looser check for pinyin tone marks."""
+    return TONE_MARK_RE.search(text) is not None
+
+
+def clear_classifier_cache():
+    """Drop memoized line classifications (called once per lesson)."""
+    has_chinese.cache_clear()
+    is_pinyin.cache_clear()
+    is_pinyin_like.cache_clear()
+
+
+# ─── Section splitter ───
+#
+# The format A dialogue, vocabulary and sample-sentence parsers each used to
+# run a lazy DOTALL search over the whole cleaned text. split_sections()
+# finds every section keyword in one scan and resolves all five bodies from
+# those positions, with the same spans as the original searches:
+#
+#   dialogue_cn       SIMPLIFIED CHINESE\s*\n(.*?)(?:TRADITIONAL CHINESE|PINYIN)
+#   dialogue_pinyin   PINYIN\s*\n(.*?)(?:ENGLISH)
+#   dialogue_en       ENGLISH\s*\n(.*?)(?:VOCABULARY|$)
+#   vocabulary        VOCABULARY\s*\n(.*?)(?:SAMPLE\s*SENTENCES|VOCABULARY\s*PHRASE\s*USAGE|GRAMMAR|CULTURAL\s*INSIGHT|$)
+#   sample_sentences  SAMPLE\s*SENTENCES\s*\n(.*?)(?:VOCABULARY\s*PHRASE\s*USAGE|GRAMMAR|CULTURAL\s*INSIGHT|$)
+#
+# Only a section's first header counts: if no terminator follows it, none
+# follows a later one either. Work is linear in the text length.
+
+# section: (header, terminators, body may run to the end of the text)
+SECTIONS = {
+    'dialogue_cn': ('SIMPLIFIED CHINESE', ('TRADITIONAL CHINESE', 'PINYIN'), False),
+    'dialogue_pinyin': ('PINYIN', ('ENGLISH',), False),
+    'dialogue_en': ('ENGLISH', ('VOCABULARY',), True),
+    'vocabulary': ('VOCABULARY', ('SAMPLE SENTENCES', 'VOCABULARY PHRASE USAGE', 'GRAMMAR', 'CULTURAL INSIGHT'), True),
+    'sample_sentences': ('SAMPLE SENTENCES', ('VOCABULARY PHRASE USAGE', 'GRAMMAR', 'CULTURAL INSIGHT'), True),
+}
+SECTION_HEADERS = {header for header, _, _ in SECTIONS.values()}
+
+SECTION_KEYWORD_RE = re.compile(
+    r'SIMPLIFIED CHINESE|TRADITIONAL CHINESE|PINYIN|ENGLISH|VOCABULARY|SAMPLE|GRAMMAR|CULTURAL'
+)
+WHITESPACE_RE = re.compile(r'\s*')
+SENTENCES_TAIL_RE = re.compile(r'\s*SENTENCES')
+PHRASE_USAGE_TAIL_RE = re.compile(r'\s*PHRASE\s*USAGE')
+INSIGHT_TAIL_RE = re.compile(r'\s*INSIGHT')
+
+
+def header_body_start(text, pos):
+    """Where a header's body starts if text[pos:] matches \\s*\\n, else None.
+
+    Greedy \\s* backtracks to the last newline in the whitespace run.
+    """
+    end = WHITESPACE_RE.match(text, pos).end()
+    newline = text.rfind('\n', pos, end)
+    return newline + 1 if newline >= 0 else None
+
+
+def split_sections(text):
+    """Map section name -> (start, end) of its body in cleaned lesson text.
+
+    Sections whose header or terminator is missing are left out, as the
+    original searches returned no match for them.
+    """
+    keywords = {}   # keyword -> positions, ascending
+    body_starts = {}  # header -> body start after its first valid occurrence
+
+    search_from = 0
+    while True:
+        m = SECTION_KEYWORD_RE.search(text, search_from)
+        if not m:
+            break
+        # Resume one character on, not at m.end(): keywords can overlap (SAMPLENGLISH)
+        pos, keyword = m.start(), m.group()
+        search_from = pos + 1
+        after = pos + len(keyword)
+        if keyword == 'SAMPLE':
+            tail = SENTENCES_TAIL_RE.match(text, after)
+            if not tail:
+                continue
+            keyword, after = 'SAMPLE SENTENCES', tail.end()
+        elif keyword == 'CULTURAL':
+            if INSIGHT_TAIL_RE.match(text, after):
+                keywords.setdefault('CULTURAL INSIGHT', []).append(pos)
+            continue
+        elif keyword == 'VOCABULARY' and PHRASE_USAGE_TAIL_RE.match(text, after):
+            keywords.setdefault('VOCABULARY PHRASE USAGE', []).append(pos)
+
+        keywords.setdefault(keyword, []).append(pos)
+        if keyword in SECTION_HEADERS and keyword not in body_starts:
+            start = header_body_start(text, after)
+            if start is not None:
+                body_starts[keyword] = start
+
+    # Python's $ (no MULTILINE) matches at the end and before a final newline
+    text_ends = [len(text) - 1, len(text)] if text.endswith('\n') else [len(text)]
+
+    sections = {}
+    for name, (header, terminators, to_end) in SECTIONS.items():
+        start = body_starts.get(header)
+        if start is None:
+            continue
+        candidates = [min(p for p in text_ends if p >= start)] if to_end else []
+        for terminator in terminators:
+            positions = keywords.get(terminator, [])
+            i = bisect_left(positions, start)
+            if i < len(positions):
+                candidates.append(positions[i])
+        if candidates:
+            sections[name] = (start, min(candidates))
+    return sections
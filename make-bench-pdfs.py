@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Generate the synthetic lesson PDFs used by bench-extraction.py.
+
+Each PDF is laid out like a ChineseClass101 lesson-notes file, with the
+card text taken from a fixed set of lessons in src/data/course-cards.json:
+  - format A (levels 1-4): SIMPLIFIED CHINESE / TRADITIONAL CHINESE / PINYIN /
+    ENGLISH dialogue blocks with the line number on its own line
+  - format B (level 5): DIALOGUE - CHINESE with SIMPLIFIED / ENGLISH / PINYIN
+    blocks and inline "1. A : ..." numbering
+followed by VOCABULARY, SAMPLE SENTENCES and GRAMMAR / CULTURAL INSIGHT
+filler, with running site headers, page numbers and CONT'D OVER markers so
+the cleaning passes have something to remove.
+
+The output is checked in under bench/pdfs/ so every benchmark run reads the
+same bytes; rerun this only when the fixture set should change.
+
+Usage: python3 make-bench-pdfs.py [--cards src/data/course-cards.json] [--out bench/pdfs]
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+CARDS_FILE = Path("src/data/course-cards.json")
+BENCH_PDF_DIR = Path("bench/pdfs")
+
+# (lesson_id, format): four lessons of each layout
+FIXTURE_LESSONS = [
+    ("L1-001", "A"),
+    ("L2-010", "A"),
+    ("L3-020", "A"),
+    ("L4-030", "A"),
+    ("L5-002", "B"),
+    ("L5-010", "B"),
+    ("L5-019", "B"),
+    ("L5-030", "B"),
+]
+
+LEVEL_NAMES = {1: "ABSOLUTE BEGINNER", 2: "BEGINNER", 3: "ELEMENTARY", 4: "INTERMEDIATE", 5: "UPPER INTERMEDIATE"}
+SPEAKERS = ("A", "B")
+PAGE_TOP, PAGE_BOTTOM, LINE_HEIGHT = 60, 780, 14
+
+
+def lesson_lines(lesson_id, lesson, fmt, rng):
+    """The text of one lesson-notes PDF, one entry per printed line."""
+    level, number = int(lesson_id[1]), int(lesson_id[3:])
+    lines = ["LESSON NOTES", f"{LEVEL_NAMES[level]} S1 #{number}", lesson["lessonTitle"],
+             "CONTENTS", "2 Simplified Chinese", "# 1"]
+    dialogue = lesson.get("dialogue", [])
+
+    if fmt == "A":
+        for header, field in (("SIMPLIFIED CHINESE", "cn"), ("TRADITIONAL CHINESE", "cn"),
+                              ("PINYIN", "pinyin"), ("ENGLISH", "en")):
+            lines.append(header)
+            for i, card in enumerate(dialogue):
+                lines += [f"{i + 1}.", f"{SPEAKERS[i % 2]}: {card[field]}"]
+    else:
+        lines += ["DIALOGUE - CHINESE", "SIMPLIFIED"]
+        lines += [f"{i + 1}. {SPEAKERS[i % 2]} : {card['cn']}" for i, card in enumerate(dialogue)]
+        lines.append("ENGLISH")
+        lines += [f"{i + 1}. {SPEAKERS[i % 2]} : {card['en']}" for i, card in enumerate(dialogue)]
+        lines.append("PINYIN")
+        lines += [f"{i + 1}. {card['pinyin']}" for i, card in enumerate(dialogue)]
+
+    lines += ["VOCABULARY", "Simplified Traditional Pinyin English Class"]
+    for card in lesson.get("vocab", []):
+        lines += [card["cn"], card["cn"], card["pinyin"], card["en"] or "-"]
+        if card.get("pos"):
+            lines.append(card["pos"])
+
+    lines.append("SAMPLE SENTENCES")
+    for card in lesson.get("sentences", []):
+        lines += [card["cn"], card["pinyin"], card["en"] or "-"]
+
+    lines.append("GRAMMAR")
+    for k in range(rng.randint(60, 200)):
+        lines.append(f"The focus of this lesson is sentence pattern {k} and how it is used in context.")
+    lines.append("CULTURAL INSIGHT")
+    for k in range(rng.randint(20, 80)):
+        lines.append(f"Cultural note {k}: everyday customs, food and family life in China.")
+    return lines
+
+
+def write_pdf(path, lines, header):
+    """Lay lines out top to bottom, adding a header and page number to every page."""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    page, y = None, PAGE_TOP
+    for line in lines:
+        if page is None or y > PAGE_BOTTOM:
+            if page is not None:
+                page.insert_text((40, y), "CONT'D OVER", fontname="helv", fontsize=8)
+            page = doc.new_page()
+            page.insert_text((40, 30), "CHINESECLASS101.COM LEARN CHINESE WITH FREE PODCASTS AND VIDEOS",
+                             fontname="helv", fontsize=8)
+            page.insert_text((40, 42), header, fontname="helv", fontsize=8)
+            page.insert_text((560, 820), str(doc.page_count), fontname="helv", fontsize=8)
+            y = PAGE_TOP
+        page.insert_text((40, y), line, fontname="china-s", fontsize=10)
+        y += LINE_HEIGHT
+    doc.subset_fonts()
+    # No creation date and no fresh file ID: the same input gives the same bytes
+    doc.set_metadata({})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc.save(path, garbage=4, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic benchmark lesson PDFs.")
+    parser.add_argument('--cards', type=Path, default=CARDS_FILE, help="card data to lay out")
+    parser.add_argument('--out', type=Path, default=BENCH_PDF_DIR, help="output directory")
+    args = parser.parse_args()
+
+    with open(args.cards, 'r', encoding='utf-8') as f:
+        cards = json.load(f)
+
+    rng = random.Random(101)
+    for lesson_id, fmt in FIXTURE_LESSONS:
+        if lesson_id not in cards:
+            print(f"ERROR: {lesson_id} not found in {args.cards}")
+            return 1
+        level, number = int(lesson_id[1]), int(lesson_id[3:])
+        path = args.out / f"format-{fmt.lower()}-{lesson_id}.pdf"
+        write_pdf(path, lesson_lines(lesson_id, cards[lesson_id], fmt, rng), f"{LEVEL_NAMES[level]} S1 #{number}")
+        print(f"  {path} ({path.stat().st_size:,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
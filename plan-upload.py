@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Plan a delta upload of resources-dist/ instead of a blind full rsync.
+
+Keeps the content hashes of what the last successful upload put on the
+server in a local state file (.cache/upload-state.json) and compares the
+tree about to be uploaded against it, so no remote stat or checksum pass
+is needed. The plan lists every path that was added, changed or removed,
+with byte totals for a dry-run estimate.
+
+Local hashes come from src/data/resource-manifest.json
+(fingerprint-resources.py) when it covers a file whose size and mtime
+still match what fingerprint-resources.py hashed (its
+.cache/resource-hashes.json), and are computed otherwise. Files are only
+compared by content hash, never by mtime.
+
+The transport consumes the plan: --files-from writes the paths to send,
+one per line, for `rsync --files-from`; --deleted-list writes the paths
+the server no longer needs; --snapshot writes the scanned tree the plan
+was made from. Once the transport succeeds, --commit --snapshot records
+exactly that snapshot as the new state, so a file that changed after
+planning is not taken as uploaded. --apply-to DIR is a transport into a
+local directory standing in for the server, so the whole cycle can be
+tested offline (there --commit alone records this run's scan), and
+--against DIR plans against such a directory instead of the state file.
+
+Usage:
+  python3 plan-upload.py                           # dry run: what would be sent
+  python3 plan-upload.py --files-from send.txt --deleted-list gone.txt --snapshot scan.json
+  python3 plan-upload.py --commit --snapshot scan.json   # after the upload succeeded
+  python3 plan-upload.py --apply-to /tmp/fake-remote --commit
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from card_output import dump_pretty, write_atomic
+from resource_layout import file_sha256, load_json
+
+LOCAL_DIR = Path("resources-dist")
+STATE_FILE = Path(".cache/upload-state.json")
+RESOURCE_MANIFEST = Path("src/data/resource-manifest.json")
+HASH_CACHE_FILE = Path(".cache/resource-hashes.json")
+FORMAT_NAME = "famlingo-upload-state"
+FORMAT_VERSION = 1
+
+
+def known_hashes(manifest_path, hash_cache_path):
+    """{hashed path: (size, mtime_ns, sha256)} that fingerprint-resources.py already computed.
+
+    The manifest maps logical paths to hashed ones; the hash cache says which
+    size and mtime each hash was taken at. Files in resources-dist/ are
+    hardlinks to resources/ or copies with the same mtime, so a file whose
+    size and mtime still match has the recorded content.
+    """
+    files = load_json(manifest_path, {"files": {}})["files"]
+    cache = load_json(hash_cache_path, {})
+    known = {}
+    for logical, entry in files.items():
+        cached = cache.get(logical)
+        if cached and cached["sha256"] == entry["sha256"]:
+            known[entry["path"]] = (cached["size"], cached["mtime_ns"], cached["sha256"])
+    return known
+
+
+def scan_tree(root, known=None):
+    """{relative path: {"size", "sha256"}} for every file under root, skipping dotfiles."""
+    known = known or {}
+    state = {}
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.startswith("."):
+                continue
+            path = Path(dirpath, name)
+            rel = path.relative_to(root).as_posix()
+            st = path.stat()
+            if rel in known and known[rel][:2] == (st.st_size, st.st_mtime_ns):
+                sha256 = known[rel][2]
+            else:
+                sha256 = file_sha256(path)
+            state[rel] = {"size": st.st_size, "sha256": sha256}
+    return state
+
+
+def load_state(path, missing_ok=True):
+    """Files recorded by the last --commit (or a --snapshot), or {} before the first upload."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        if not missing_ok:
+            raise
+        return {}
+    if data.get("format") != FORMAT_NAME or data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} v{FORMAT_VERSION} file")
+    return data["files"]
+
+
+def save_state(path, files, stamp="uploaded_at"):
+    data = {"format": FORMAT_NAME, "version": FORMAT_VERSION, stamp: int(time.time()), "files": files}
+    write_atomic(path, dump_pretty(data).encode('utf-8'))
+
+
+def plan_upload(local, remote):
+    """Compare two {path: {"size", "sha256"}} states; returns the plan dict."""
+    added = sorted(p for p in local if p not in remote)
+    changed = sorted(p for p in local if p in remote and local[p]["sha256"] != remote[p]["sha256"])
+    removed = sorted(p for p in remote if p not in local)
+    return {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "unchanged": len(local) - len(added) - len(changed),
+        "send_bytes": sum(local[p]["size"] for p in added + changed),
+        "total_bytes": sum(entry["size"] for entry in local.values()),
+        "removed_bytes": sum(remote[p]["size"] for p in removed),
+    }
+
+
+def apply_plan(plan, local_dir, remote_dir, delete):
+    """Carry out the plan against a local directory standing in for the server."""
+    for rel in plan["added"] + plan["changed"]:
+        dest = remote_dir / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dest.with_name(f".{dest.name}.tmp")
+        shutil.copyfile(local_dir / rel, tmp_path)
+        os.replace(tmp_path, dest)
+    if delete:
+        for rel in plan["removed"]:
+            (remote_dir / rel).unlink(missing_ok=True)
+
+
+def write_list(path, paths):
+    write_atomic(path, ''.join(f"{p}\n" for p in paths).encode('utf-8'))
+
+
+def print_plan(plan, limit):
+    for label, key in (("+", "added"), ("~", "changed"), ("-", "removed")):
+        paths = plan[key]
+        for rel in paths[:limit]:
+            print(f"  {label} {rel}")
+        if len(paths) > limit:
+            print(f"  {label} ... and {len(paths) - limit} more")
+    print(f"{len(plan['added'])} added, {len(plan['changed'])} changed, {len(plan['removed'])} removed, "
+          f"{plan['unchanged']} unchanged")
+    share = plan['send_bytes'] / plan['total_bytes'] if plan['total_bytes'] else 0.0
+    print(f"To send: {plan['send_bytes']:,} of {plan['total_bytes']:,} bytes ({share:.1%}); "
+          f"no longer needed on the server: {plan['removed_bytes']:,} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan a delta upload of the fingerprinted resources.")
+    parser.add_argument('--local', type=Path, default=LOCAL_DIR, help=f"tree to upload (default: {LOCAL_DIR})")
+    parser.add_argument('--state', type=Path, default=STATE_FILE,
+                        help=f"hashes of the last successful upload (default: {STATE_FILE})")
+    parser.add_argument('--manifest', type=Path, default=RESOURCE_MANIFEST,
+                        help=f"fingerprint manifest to take hashes from (default: {RESOURCE_MANIFEST})")
+    parser.add_argument('--hash-cache', type=Path, default=HASH_CACHE_FILE,
+                        help=f"fingerprint hash cache, for the manifest hashes' mtimes (default: {HASH_CACHE_FILE})")
+    parser.add_argument('--against', type=Path, metavar='DIR',
+                        help="plan against this directory's contents instead of the state file")
+    parser.add_argument('--files-from', type=Path, metavar='FILE', help="write the paths to send, one per line")
+    parser.add_argument('--deleted-list', type=Path, metavar='FILE', help="write the removed paths, one per line")
+    parser.add_argument('--output', type=Path, metavar='FILE', help="write the whole plan as JSON")
+    parser.add_argument('--snapshot', type=Path, metavar='FILE',
+                        help="write the scanned tree the plan is made from; with --commit, record this "
+                             "file instead of scanning again")
+    parser.add_argument('--apply-to', type=Path, metavar='DIR', help="carry out the plan into a local directory")
+    parser.add_argument('--delete', action='store_true', help="with --apply-to, also delete removed files")
+    parser.add_argument('--commit', action='store_true',
+                        help="record the planned tree as uploaded (run after the transport succeeds)")
+    parser.add_argument('--limit', type=int, default=20, help="paths listed per kind (default: 20)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.commit and args.snapshot and not args.apply_to:
+        # The transport ran from an earlier plan: record exactly what that plan saw
+        try:
+            files = load_state(args.snapshot, missing_ok=False)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: cannot read snapshot: {e}")
+            return 1
+        save_state(args.state, files)
+        print(f"Recorded {len(files)} files from {args.snapshot} in {args.state}")
+        return 0
+    if not args.local.is_dir():
+        print(f"ERROR: {args.local} not found (run sanitize-resources.sh first)")
+        return 1
+    local = scan_tree(args.local, known_hashes(args.manifest, args.hash_cache))
+    remote = scan_tree(args.against) if args.against else load_state(args.state)
+    plan = plan_upload(local, remote)
+    print_plan(plan, args.limit)
+
+    if args.files_from:
+        write_list(args.files_from, plan["added"] + plan["changed"])
+        print(f"Transfer list: {args.files_from}")
+    if args.deleted_list:
+        write_list(args.deleted_list, plan["removed"])
+        print(f"Removed list: {args.deleted_list}")
+    if args.output:
+        write_atomic(args.output, dump_pretty(plan).encode('utf-8'))
+        print(f"Plan: {args.output}")
+    if args.snapshot:
+        save_state(args.snapshot, local, stamp="scanned_at")
+        print(f"Snapshot: {args.snapshot}")
+    if args.apply_to:
+        apply_plan(plan, args.local, args.apply_to, args.delete)
+        print(f"Applied to {args.apply_to}")
+    if args.commit:
+        save_state(args.state, local)
+        print(f"Recorded {len(local)} files in {args.state}")
+    print(f"({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
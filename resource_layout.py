@@ -0,0 +1,488 @@
+"""
+Layout of the vendor Learn_Mandarin bundle inside resources/.
+
+plan_resources() walks the bundle once and decides, for every file the app
+serves, its normalized path under resources/ and its catalog entry:
+  - courses/level-N/audio/006-meeting-time-for-class.mp3  (lessons in courses.json)
+  - courses/level-N/materials/006-lesson.pdf              (materials in courses.json)
+  - courses/vocab/enzh029.mp3                             (vocab in courses.json)
+  - library/<category>/<slug>.pdf                         (books in library.json)
+
+The names and entries are the ones sanitize-resources.sh has always
+produced: slugify() is its sed/tr pipeline done in-process. One deliberate
+difference: the script ran a plain `sort`, which orders lists by the
+caller's locale, while lists here are sorted by byte value (`sort` under
+LC_ALL=C), so the catalogs come out the same on every machine.
+"""
+
+import hashlib
+import json
+import re
+from collections import namedtuple
+from pathlib import Path
+
+VENDOR_DIR = Path("/home/cmantra/Learn_Mandarin")
+TUTORIAL_DIR = "Chinese Language Tutorial Bundle"
+EBOOKS_DIR = "Chinese Language eBooks Collection"
+CATALOG_VERSION = "1.0"
+
+# A file to serve: where it comes from and its path relative to resources/
+Resource = namedtuple("Resource", ["source", "path"])
+
+LEVELS = {
+    1: ({"en": "Level 1 - Absolute Beginner", "cn": "第一级 - 零基础"},
+        {"en": "Essential daily situations and basic phrases", "cn": "基本日常情景和常用短语"}, "🌱"),
+    2: ({"en": "Level 2 - Beginner", "cn": "第二级 - 初学者"},
+        {"en": "Daily life and cultural immersion", "cn": "日常生活和文化体验"}, "🌿"),
+    3: ({"en": "Level 3 - Lower Intermediate", "cn": "第三级 - 中级入门"},
+        {"en": "Social interactions and deeper conversations", "cn": "社交互动和深入对话"}, "🌳"),
+    4: ({"en": "Level 4 - Intermediate", "cn": "第四级 - 中级"},
+        {"en": "Advanced daily topics and cultural nuances", "cn": "高级日常话题和文化细节"}, "🏔️"),
+    5: ({"en": "Level 5 - Upper Intermediate", "cn": "第五级 - 中高级"},
+        {"en": "Complex topics, business, and society", "cn": "复杂话题、商务和社会"}, "⭐"),
+}
+
+MATERIAL_TYPES = [
+    # (type, filename pattern, name suffix, title prefix); the last one is the fallback
+    ("hanzi", re.compile(r"hanzi_closeup|honzi_closeup", re.I), "-hanzi-closeup", "Hanzi Closeup"),
+    ("script", re.compile(r"recordingscript|recording_script", re.I), "-recording-script", "Recording Script"),
+    ("lesson", re.compile(r""), "-lesson", "Lesson Notes"),
+]
+
+# library.json, in app order. "source" is the file's path inside the vendor bundle.
+LIBRARY_CATEGORIES = [
+    {"id": "study-notes", "name": {"en": "Study Notes", "cn": "学习笔记"}, "icon": "📓", "books": [
+        {"id": "notes-mandarin-complete", "source": "Updated Mandarin Study Notes + Extras in One.pdf",
+         "file": "mandarin-study-notes.pdf",
+         "title": {"en": "Mandarin Study Notes + Extras", "cn": "普通话学习笔记及附加内容"},
+         "description": {"en": "Comprehensive compiled study notes (large file: ~630MB)",
+                         "cn": "综合编纂学习笔记（大文件：约630MB）"},
+         "level": "all", "sizeWarning": True},
+    ]},
+    {"id": "reference", "name": {"en": "Reference & Dictionaries", "cn": "参考与词典"}, "icon": "📖", "books": [
+        {"id": "ref-measure-words",
+         "source": f"{EBOOKS_DIR}/A Chinese Measure Word Dictionary. A Chinese-English English-Chinese User Guide  _.pdf",
+         "file": "chinese-measure-word-dictionary.pdf",
+         "title": {"en": "Chinese Measure Word Dictionary", "cn": "中文量词词典"},
+         "description": {"en": "Chinese-English/English-Chinese guide to measure words", "cn": "中英量词使用指南"},
+         "level": "intermediate"},
+        {"id": "ref-characters-dict",
+         "source": f"{EBOOKS_DIR}/Chinese Characters Dictionary with English Annotations (English and Chinese Edition).pdf",
+         "file": "chinese-characters-dictionary.pdf",
+         "title": {"en": "Chinese Characters Dictionary", "cn": "汉英字典"},
+         "description": {"en": "Dictionary with English annotations", "cn": "带英文注释的字典"},
+         "level": "all"},
+        {"id": "ref-periplus",
+         "source": f"{EBOOKS_DIR}/Periplus Pocket Mandarin Chinese Dictionary Chinese-English English-Chinese "
+                   "(Fully Romanized).pdf",
+         "file": "periplus-pocket-dictionary.pdf",
+         "title": {"en": "Periplus Pocket Mandarin Dictionary", "cn": "随身普通话词典"},
+         "description": {"en": "Chinese-English/English-Chinese, fully romanized", "cn": "中英双向，带拼音"},
+         "level": "beginner"},
+    ]},
+    {"id": "characters", "name": {"en": "Character Learning", "cn": "汉字学习"}, "icon": "🀄", "books": [
+        {"id": "char-250-essential",
+         "source": f"{EBOOKS_DIR}/250 Essential Chinese Characters Volume 1 Revised Edition.pdf",
+         "file": "250-essential-characters-v1.pdf",
+         "title": {"en": "250 Essential Chinese Characters Vol. 1", "cn": "250个基本汉字（第1卷）"},
+         "description": {"en": "Revised edition of essential character learning", "cn": "基本汉字学习修订版"},
+         "level": "beginner"},
+        {"id": "char-2178",
+         "source": f"{EBOOKS_DIR}/Chinese Characters - Learn _ Remember 2,178 Characters and Their Meanings.pdf",
+         "file": "learn-remember-2178-characters.pdf",
+         "title": {"en": "Learn & Remember 2,178 Characters", "cn": "学记2178个汉字"},
+         "description": {"en": "Characters and their meanings", "cn": "汉字及其含义"},
+         "level": "intermediate"},
+        {"id": "char-hsk-a",
+         "source": f"{EBOOKS_DIR}/Learning Chinese Characters - A Revolutionary New Way to Learn and Remember "
+                   "the 800 Most Basic Chinese Characters. HSK level A.pdf",
+         "file": "learning-characters-hsk-a.pdf",
+         "title": {"en": "Learning Chinese Characters - HSK Level A", "cn": "学习汉字 - HSK A级"},
+         "description": {"en": "800 most basic characters for HSK preparation", "cn": "HSK备考800个基本汉字"},
+         "level": "beginner"},
+        {"id": "char-first-100",
+         "source": f"{EBOOKS_DIR}/The First 100 Chinese Characters - The Quick and Easy Method to Learn "
+                   "the 100 Most Basic Chinese Characters.pdf",
+         "file": "first-100-characters.pdf",
+         "title": {"en": "The First 100 Chinese Characters", "cn": "第一批100个汉字"},
+         "description": {"en": "Quick and easy method for the most basic characters", "cn": "最基本汉字的快速简单方法"},
+         "level": "beginner"},
+        {"id": "char-tuttle-800",
+         "source": f"{EBOOKS_DIR}/Tuttle Learning Chinese Characters - A Revolutionary New Way to Learn and "
+                   "Remember the 800 Most Basic Chinese Characters.pdf",
+         "file": "tuttle-learning-characters.pdf",
+         "title": {"en": "Tuttle Learning Chinese Characters", "cn": "Tuttle学汉字"},
+         "description": {"en": "Revolutionary way to learn 800 basic characters", "cn": "学习800个基本汉字的新方法"},
+         "level": "beginner"},
+        {"id": "char-kids-flash",
+         "source": f"{EBOOKS_DIR}/Tuttle More Chinese for Kids Flash Cards Simplified Character. Includes "
+                   "64 Flash Cards, Wall Chart _ Learning Guide.pdf",
+         "file": "tuttle-kids-flash-cards.pdf",
+         "title": {"en": "Tuttle Chinese for Kids Flash Cards", "cn": "儿童汉字闪卡"},
+         "description": {"en": "64 flash cards with wall chart and learning guide", "cn": "64张闪卡附挂图和学习指南"},
+         "level": "beginner"},
+    ]},
+    {"id": "grammar", "name": {"en": "Grammar & Workbooks", "cn": "语法与练习册"}, "icon": "📝", "books": [
+        {"id": "gram-reading-writing-text",
+         "source": f"{EBOOKS_DIR}/Basic Mandarin Chinese - Reading _ Writing Textbook - An Introduction to "
+                   "Written Chinese for Beginners.pdf",
+         "file": "basic-mandarin-reading-writing-textbook.pdf",
+         "title": {"en": "Basic Mandarin - Reading & Writing Textbook", "cn": "基础普通话 - 读写教材"},
+         "description": {"en": "Introduction to written Chinese for beginners", "cn": "初学者书面中文入门"},
+         "level": "beginner"},
+        {"id": "gram-reading-writing-practice",
+         "source": f"{EBOOKS_DIR}/Basic Mandarin Chinese - Reading _ Writing Practice Book - A Workbook for "
+                   "Beginning Learners of Written Chinese.pdf",
+         "file": "basic-mandarin-reading-writing-practice.pdf",
+         "title": {"en": "Basic Mandarin - Reading & Writing Practice", "cn": "基础普通话 - 读写练习"},
+         "description": {"en": "Workbook for beginning learners of written Chinese", "cn": "书面中文初学者练习册"},
+         "level": "beginner"},
+        {"id": "gram-spoken-practice",
+         "source": f"{EBOOKS_DIR}/Basic Spoken Chinese Practice Essentials - An Introduction to Speaking and "
+                   "Listening for Beginners.pdf",
+         "file": "basic-spoken-chinese-practice.pdf",
+         "title": {"en": "Basic Spoken Chinese Practice", "cn": "基础口语练习"},
+         "description": {"en": "Introduction to speaking and listening for beginners", "cn": "初学者口语和听力入门"},
+         "level": "beginner"},
+        {"id": "gram-intermediate-written",
+         "source": f"{EBOOKS_DIR}/Intermediate Written Chinese Practice Essentials _ Read and Write Mandarin "
+                   "Chinese as the Chinese Do.pdf",
+         "file": "intermediate-written-chinese-practice.pdf",
+         "title": {"en": "Intermediate Written Chinese Practice", "cn": "中级书面中文练习"},
+         "description": {"en": "Read and write Mandarin Chinese as the Chinese do", "cn": "像中国人一样读写普通话"},
+         "level": "intermediate"},
+    ]},
+    {"id": "textbooks", "name": {"en": "Textbooks & Courses", "cn": "教材与课程"}, "icon": "🎓", "books": [
+        {"id": "text-teach-yourself", "source": f"{EBOOKS_DIR}/Teach Yourself Beginner_s Mandarin Chinese.pdf",
+         "file": "teach-yourself-beginners-mandarin.pdf",
+         "title": {"en": "Teach Yourself Beginner's Mandarin", "cn": "自学初级普通话"},
+         "description": {"en": "Complete self-study course for beginners", "cn": "初学者完整自学课程"},
+         "level": "beginner"},
+        {"id": "text-happy-chinese",
+         "source": f"{EBOOKS_DIR}/Happy Chinese (Kuaile Hanyu) Student_s Book. Volume 1 _ _).pdf",
+         "file": "happy-chinese-vol-1.pdf",
+         "title": {"en": "Happy Chinese (Kuaile Hanyu) Vol. 1", "cn": "快乐汉语（第1卷）"},
+         "description": {"en": "Student's book for structured Chinese learning", "cn": "结构化汉语学习学生用书"},
+         "level": "beginner"},
+        {"id": "text-i-love-learning",
+         "source": f"{EBOOKS_DIR}/I Love Learning Chinese. Specially Designed for Primary School. Volume 1 _ _1_.pdf",
+         "file": "i-love-learning-chinese-vol-1.pdf",
+         "title": {"en": "I Love Learning Chinese Vol. 1", "cn": "我爱学中文（第1卷）"},
+         "description": {"en": "Specially designed for primary school students", "cn": "专为小学生设计"},
+         "level": "beginner"},
+        {"id": "text-for-dummies", "source": f"{EBOOKS_DIR}/Chinese for Dummies.pdf",
+         "file": "chinese-for-dummies.pdf",
+         "title": {"en": "Chinese for Dummies", "cn": "中文入门"},
+         "description": {"en": "Accessible introduction to the Chinese language", "cn": "轻松入门中文"},
+         "level": "beginner"},
+    ]},
+    {"id": "phrasebooks", "name": {"en": "Phrasebooks", "cn": "短语手册"}, "icon": "💬", "books": [
+        {"id": "phrase-instant",
+         "source": f"{EBOOKS_DIR}/Instant Chinese - A Mandarin Chinese Phrasebook _ Dictionary.pdf",
+         "file": "instant-chinese-phrasebook.pdf",
+         "title": {"en": "Instant Chinese Phrasebook", "cn": "即时中文短语手册"},
+         "description": {"en": "Mandarin Chinese phrasebook and dictionary", "cn": "普通话短语手册和词典"},
+         "level": "beginner"},
+        {"id": "phrase-1000-ideas",
+         "source": f"{EBOOKS_DIR}/Instant Chinese - How To Express Over 1,000 Different Ideas With Just 100 Key "
+                   "Words And Phrases! (A Mandarin Chinese Language Phrasebook).pdf",
+         "file": "instant-chinese-1000-ideas.pdf",
+         "title": {"en": "Instant Chinese - 1,000 Ideas", "cn": "即时中文 - 1000个表达"},
+         "description": {"en": "Express 1,000+ ideas with 100 key words and phrases", "cn": "用100个关键词表达1000多个意思"},
+         "level": "beginner"},
+        {"id": "phrase-essential", "source": f"{EBOOKS_DIR}/Essential Chinese - Speak Chinese with Confidence!.pdf",
+         "file": "essential-chinese.pdf",
+         "title": {"en": "Essential Chinese", "cn": "必备中文"},
+         "description": {"en": "Speak Chinese with confidence", "cn": "自信说中文"},
+         "level": "beginner"},
+        {"id": "phrase-survival",
+         "source": f"{EBOOKS_DIR}/Survival Chinese - How to Communicate without Fuss or Fear - Instantly!.pdf",
+         "file": "survival-chinese.pdf",
+         "title": {"en": "Survival Chinese", "cn": "生存中文"},
+         "description": {"en": "Communicate without fuss or fear", "cn": "轻松无压力地交流"},
+         "level": "beginner"},
+        {"id": "phrase-visual",
+         "source": f"{EBOOKS_DIR}/Mandarin Chinese - Visual Phrase Book (Eyewitness Travel Guides).pdf",
+         "file": "visual-phrase-book.pdf",
+         "title": {"en": "Mandarin Visual Phrase Book", "cn": "普通话视觉短语手册"},
+         "description": {"en": "Eyewitness Travel Guide visual phrasebook", "cn": "旅行视觉短语手册"},
+         "level": "beginner"},
+    ]},
+    {"id": "specialized", "name": {"en": "Vocabulary & Specialized", "cn": "词汇与专项"}, "icon": "🧠", "books": [
+        {"id": "spec-vocab-9000", "source": f"{EBOOKS_DIR}/Chinese Vocabulary for English Speakers - 9000 Words.pdf",
+         "file": "chinese-vocab-9000-words.pdf",
+         "title": {"en": "Chinese Vocabulary - 9,000 Words", "cn": "中文词汇 - 9000个词"},
+         "description": {"en": "Comprehensive vocabulary for English speakers", "cn": "英语使用者综合词汇"},
+         "level": "intermediate"},
+        {"id": "spec-student-approaches",
+         "source": f"{EBOOKS_DIR}/Student Approaches to Learning Chinese Vocabulary.pdf",
+         "file": "student-approaches-vocab.pdf",
+         "title": {"en": "Student Approaches to Chinese Vocabulary", "cn": "学生学习中文词汇的方法"},
+         "description": {"en": "Research on effective vocabulary learning strategies", "cn": "有效词汇学习策略研究"},
+         "level": "all"},
+        {"id": "spec-teaching-learning",
+         "source": f"{EBOOKS_DIR}/Teaching and Learning Chinese as a Foreign Language - A Pedagogical Grammar.pdf",
+         "file": "teaching-learning-chinese-foreign-language.pdf",
+         "title": {"en": "Teaching Chinese as a Foreign Language", "cn": "对外汉语教学"},
+         "description": {"en": "Pedagogical grammar for Chinese language teaching", "cn": "汉语教学语法"},
+         "level": "advanced"},
+        {"id": "spec-understanding",
+         "source": f"{EBOOKS_DIR}/Understanding the Chinese Language - A Comprehensive Linguistic Introduction "
+                   "(English and Chinese Edition).pdf",
+         "file": "understanding-chinese-language.pdf",
+         "title": {"en": "Understanding the Chinese Language", "cn": "理解中文"},
+         "description": {"en": "Comprehensive linguistic introduction", "cn": "综合语言学介绍"},
+         "level": "advanced"},
+        {"id": "spec-translation",
+         "source": f"{EBOOKS_DIR}/Thinking Chinese Translation- A Course in Translation Method.Chinese to "
+                   "English (Thinking Translation).pdf",
+         "file": "thinking-chinese-translation.pdf",
+         "title": {"en": "Thinking Chinese Translation", "cn": "中文翻译思维"},
+         "description": {"en": "Course in translation method: Chinese to English", "cn": "中译英翻译方法课程"},
+         "level": "advanced"},
+        {"id": "spec-read-chinese",
+         "source": f"{EBOOKS_DIR}/Learn to Read Chinese - An Introduction to the Language and Concepts of "
+                   "Current Zhongyi Literature, Vol. 2.pdf",
+         "file": "learn-to-read-chinese-vol-2.pdf",
+         "title": {"en": "Learn to Read Chinese Vol. 2", "cn": "学习阅读中文（第2卷）"},
+         "description": {"en": "Introduction to Zhongyi literature and concepts", "cn": "中医文献和概念入门"},
+         "level": "advanced"},
+    ]},
+]
+LIBRARY_SOURCE_KEYS = ("source", "file")
+
+# Content-fingerprinted names (fingerprint-resources.py): name.<12 hex digits of SHA-256>.ext
+HASH_LENGTH = 12
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{%d}(?=\.[^./]+$)" % HASH_LENGTH)
+CATALOG_PATH_KEYS = ("audioPath", "path")
+HASH_CHUNK = 1024 * 1024
+
+# Large library PDFs are also served in parts (split-library-pdfs.py), kept under
+# <book>.parts/ next to the book; these book fields are maintained by that tool
+PARTS_DIR_SUFFIX = ".parts"
+DERIVED_BOOK_KEYS = ("pageCount", "parts")
+
+ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+LEADING_NUMBER_RE = re.compile(r"^\d+")
+LEADING_TITLE_NOISE_RE = re.compile(r"^[0-9]* *")
+
+
+def slugify(text):
+    """'Meeting - Time for Class' -> 'meeting-time-for-class', as sanitize-resources.sh did it."""
+    text = re.sub("[—–]", "-", text).translate(ASCII_LOWER)
+    text = re.sub(r"[^a-z0-9 -]", "", text)
+    text = re.sub(" +", " ", text).strip(" ").replace(" ", "-")
+    text = re.sub("-+", "-", text)
+    return text[:-1] if text.endswith("-") else text
+
+
+def pad3(number):
+    return f"{int(number):03d}"
+
+
+def leading_number(name):
+    match = LEADING_NUMBER_RE.match(name)
+    return match.group() if match else "0"
+
+
+def list_files(directory, suffix):
+    """Files in directory (not below it) ending in suffix, minus Windows Zone.Identifier leftovers."""
+    try:
+        entries = list(directory.iterdir())
+    except FileNotFoundError:
+        return []
+    return sorted(p for p in entries
+                  if p.name.endswith(suffix) and "Zone.Identifier" not in p.name and p.is_file())
+
+
+def hashed_path(path, sha256):
+    """'a/b/name.mp3' -> 'a/b/name.<first HASH_LENGTH hex digits>.mp3'."""
+    stem, dot, suffix = path.rpartition(".")
+    if not dot or "/" in suffix:
+        return f"{path}.{sha256[:HASH_LENGTH]}"
+    return f"{stem}.{sha256[:HASH_LENGTH]}.{suffix}"
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file, read in HASH_CHUNK pieces."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_json(path, default):
+    """A JSON state file (manifest, hash cache), or default when it does not exist yet."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def logical_path(path):
+    """Undo hashed_path() (no-op for a path without a fingerprint)."""
+    return HASHED_NAME_RE.sub("", path, count=1)
+
+
+def parts_dir(path):
+    """'library/x/book.pdf' -> 'library/x/book.parts', where the book's parts are staged."""
+    stem, dot, suffix = path.rpartition(".")
+    return (stem if dot and "/" not in suffix else path) + PARTS_DIR_SUFFIX
+
+
+def map_catalog_paths(node, fn):
+    """Replace every audioPath/path string in a catalog with fn(path); returns how many changed."""
+    changed = 0
+    if isinstance(node, list):
+        for item in node:
+            changed += map_catalog_paths(item, fn)
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            if key in CATALOG_PATH_KEYS and isinstance(value, str):
+                new = fn(value)
+                if new != value:
+                    node[key] = new
+                    changed += 1
+            else:
+                changed += map_catalog_paths(value, fn)
+    return changed
+
+
+def c_sorted(rows):
+    """Sort rows by the bytes of their first three fields joined as the script's 'a|b|c' lines.
+
+    This is `LC_ALL=C sort`, not the script's locale-dependent plain `sort`.
+    """
+    return sorted(rows, key=lambda row: '|'.join(row[:3]).encode('utf-8'))
+
+
+class ResourcePlan:
+    """Every file to stage under resources/ plus the catalog entries that point at them.
+
+    When two vendor files map to the same path the later one in files
+    wins, as it did with cp.
+    """
+
+    def __init__(self):
+        self.files = []     # [Resource]
+        self.levels = []    # courses.json levels 1-5
+        self.vocab = []     # courses.json vocab
+        self.library = []   # library.json categories
+        self.missing = []   # expected vendor files that are not there
+
+    def add(self, source, path):
+        self.files.append(Resource(Path(source), path))
+        return path
+
+
+def plan_level(plan, level, level_dir):
+    audio = []
+    for mp3 in list_files(level_dir, ".mp3"):
+        if "(1)" in mp3.name:  # duplicate downloads
+            continue
+        stem = mp3.name[:-len(".mp3")]
+        padded = pad3(leading_number(stem))
+        title = LEADING_TITLE_NOISE_RE.sub("", stem, count=1)
+        clean_name = f"{padded}-{slugify(title) or 'lesson'}.mp3"
+        audio.append((padded, clean_name, title, plan.add(mp3, f"courses/level-{level}/audio/{clean_name}")))
+    lessons = [{"id": f"L{level}-{padded}", "title": title, "audioPath": path, "order": order}
+               for order, (padded, clean_name, title, path) in enumerate(c_sorted(audio), 1)]
+
+    materials = []
+    used = set()
+    for pdf in list_files(level_dir / "PDF", ".pdf"):
+        stem = pdf.name[:-len(".pdf")]
+        padded = pad3(leading_number(stem))
+        material_type, _, suffix, label = next(t for t in MATERIAL_TYPES if t[1].search(stem))
+        clean_name = f"{padded}{suffix}.pdf"
+        counter = 2
+        while clean_name in used:
+            clean_name = f"{padded}{suffix}-{counter}.pdf"
+            counter += 1
+        used.add(clean_name)
+        materials.append((padded, clean_name, material_type, label,
+                          plan.add(pdf, f"courses/level-{level}/materials/{clean_name}")))
+
+    name, description, icon = LEVELS[level]
+    plan.levels.append({
+        "id": f"level-{level}",
+        "name": name,
+        "description": description,
+        "icon": icon,
+        "lessons": lessons,
+        "materials": [{"id": f"L{level}-M{padded}-{material_type}", "title": f"{label} {padded}",
+                       "type": material_type, "path": path}
+                      for padded, clean_name, material_type, label, path in c_sorted(materials)],
+    })
+
+
+def plan_vocab(plan, tutorial_dir):
+    # The vocabulary folder's name is spelled in Unicode bold letters, so match loosely
+    try:
+        candidates = sorted(p for p in tutorial_dir.iterdir() if p.is_dir() and "ocab" in p.name)
+    except FileNotFoundError:
+        candidates = []
+    if not candidates:
+        plan.missing.append(f"{tutorial_dir}/*ocab*/")
+        return
+    rows = []
+    for mp3 in list_files(candidates[0], ".mp3"):
+        stem = mp3.name[:-len(".mp3")]
+        clean_name = stem.translate(ASCII_LOWER) + ".mp3"
+        rows.append((clean_name, stem, plan.add(mp3, f"courses/vocab/{clean_name}")))
+    for clean_name, stem, path in c_sorted(rows):
+        vocab_id = clean_name[:-len(".mp3")].upper()
+        plan.vocab.append({"id": f"V-{vocab_id}", "title": f"Vocabulary {vocab_id}", "audioPath": path})
+
+
+def plan_library(plan, vendor_dir):
+    """Every LIBRARY_CATEGORIES book, staged if its vendor file is there.
+
+    A missing book keeps its library.json entry, as in the static list the
+    shell script wrote, and is reported in plan.missing.
+    """
+    for category in LIBRARY_CATEGORIES:
+        books = []
+        for book in category["books"]:
+            source = vendor_dir / book["source"]
+            path = f"library/{category['id']}/{book['file']}"
+            if source.is_file():
+                plan.add(source, path)
+            else:
+                plan.missing.append(str(source))
+            entry = {k: v for k, v in book.items() if k not in LIBRARY_SOURCE_KEYS}
+            # path goes after description, where library.json has always had it
+            books.append({**{k: entry.pop(k) for k in ("id", "title", "description")}, "path": path, **entry})
+        plan.library.append({**{k: v for k, v in category.items() if k != "books"}, "books": books})
+
+
+def plan_resources(vendor_dir=VENDOR_DIR):
+    """Walk the vendor bundle once and return its ResourcePlan."""
+    vendor_dir = Path(vendor_dir)
+    tutorial_dir = vendor_dir / TUTORIAL_DIR
+    plan = ResourcePlan()
+    for level in LEVELS:
+        plan_level(plan, level, tutorial_dir / f"Level {level} Chinese Mandarin")
+    plan_vocab(plan, tutorial_dir)
+    plan_library(plan, vendor_dir)
+    return plan
+
+
+def build_courses(plan, existing=None):
+    """courses.json from the plan. Levels the bundle does not provide (study-notes) are kept from existing."""
+    generated = {level["id"] for level in plan.levels}
+    kept = [level for level in (existing or {}).get("levels", []) if level["id"] not in generated]
+    return {"version": CATALOG_VERSION, "levels": plan.levels + kept, "vocab": plan.vocab}
+
+
+def build_library(plan, existing=None):
+    """library.json from the plan, keeping the page index split-library-pdfs.py added to existing books."""
+    derived = {}
+    for category in (existing or {}).get("categories", []):
+        for book in category.get("books", []):
+            derived[book["id"]] = {k: book[k] for k in DERIVED_BOOK_KEYS if k in book}
+    categories = [{**category, "books": [{**book, **derived.get(book["id"], {})} for book in category["books"]]}
+                  for category in plan.library]
+    return {"version": CATALOG_VERSION, "categories": categories}
@@ -0,0 +1,19 @@
+"""
+Import one of the repo's command-line scripts as a module.
+
+The scripts are named with dashes (stage-resources.py,
+extract-lesson-cards.py), so `import` cannot reach them by name; tools
+that reuse their functions load them from the file instead.
+"""
+
+import importlib.util
+from pathlib import Path
+
+
+def load_script(filename):
+    """Import a script next to this file, e.g. load_script("stage-resources.py") -> module stage_resources."""
+    path = Path(__file__).with_name(filename)
+    spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Split large library PDFs into parts a phone can fetch one at a time.
+
+library.json lists the ~630 MB study notes as a single file, so showing
+any page means downloading the start of that file first. This tool cuts
+every staged library PDF over --min-size-mb (and every book flagged
+sizeWarning) into parts with PyMuPDF, next to the book:
+
+  library/study-notes/mandarin-study-notes.pdf
+  library/study-notes/mandarin-study-notes.parts/part-001.pdf, part-002.pdf, ...
+
+Parts follow the book's top-level chapters (its outline) when it has at
+least two, with chapters longer than --pages-per-part cut further, and
+fall back to runs of --pages-per-part pages. Each book in library.json
+gets a page index, so a reader can map a page number to the one part it
+has to fetch:
+
+  "pageCount": 812,
+  "parts": [{"path": ".../part-001.pdf", "firstPage": 1, "lastPage": 40,
+             "size": 31457280, "title": "Pronunciation"}, ...]
+
+The whole book stays available at its original path. MuPDF no longer
+writes linearized PDFs, so parts are saved compacted (garbage collection,
+deflate) instead; being small, their first page arrives quickly, and
+nginx serves byte ranges of them as it does for the full book.
+
+A book is split again only when its file or the split settings change
+(recorded in <book>.parts/.source.json). A book PyMuPDF cannot read, or
+one without pages, is left whole, without a page index, with a warning.
+Run after build-catalog.py and before fingerprint-resources.py, which
+fingerprints the parts too.
+
+Usage:
+  python3 split-library-pdfs.py [--resources resources] [--min-size-mb 100] [--pages-per-part 40]
+  python3 split-library-pdfs.py --by pages --pages-per-part 25
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from card_output import dump_pretty, write_atomic
+from course_catalog import update_catalog
+from resource_layout import logical_path, parts_dir
+
+RESOURCES_DIR = Path("resources")
+LIBRARY_FILE = Path("src/data/library.json")
+STAMP_NAME = ".source.json"
+
+
+def part_ranges(doc, pages_per_part, by):
+    """[(first page, last page, title)] 0-based and inclusive, covering every page once."""
+    page_count = doc.page_count
+    starts = []
+    if by in ("auto", "chapters"):
+        for level, title, page in doc.get_toc(simple=True):
+            # Outline pages are 1-based; entries without a target page are -1
+            if level == 1 and 1 <= page <= page_count and (not starts or page - 1 > starts[-1][0]):
+                starts.append((page - 1, title.strip()))
+        if len(starts) < 2:
+            starts = []
+        elif starts[0][0] > 0:
+            starts.insert(0, (0, ""))  # front matter before the first chapter
+    if not starts:
+        starts = [(0, "")]
+
+    ranges = []
+    for i, (first, title) in enumerate(starts):
+        last = starts[i + 1][0] - 1 if i + 1 < len(starts) else page_count - 1
+        for chunk_first in range(first, last + 1, pages_per_part):
+            ranges.append((chunk_first, min(chunk_first + pages_per_part - 1, last), title))
+    return ranges
+
+
+def write_part(doc, first, last, path):
+    import fitz  # PyMuPDF
+
+    part = fitz.open()
+    try:
+        part.insert_pdf(doc, from_page=first, to_page=last)
+        # The book's metadata rather than fresh dates, so re-splitting an unchanged book gives the same bytes
+        part.set_metadata(doc.metadata)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        part.save(tmp_path, garbage=3, deflate=True, no_new_id=True)
+        os.replace(tmp_path, path)
+    finally:
+        part.close()
+
+
+def split_book(source, book_path, resources_dir, pages_per_part, by):
+    """Split one staged book; returns (index entries with logical paths, page count, was split)."""
+    import fitz  # PyMuPDF
+
+    out_dir = resources_dir / parts_dir(book_path)
+    stamp_path = out_dir / STAMP_NAME
+    st = source.stat()
+    settings = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "pages_per_part": pages_per_part, "by": by}
+    try:
+        with open(stamp_path, 'r', encoding='utf-8') as f:
+            stamp = json.load(f)
+        if stamp["settings"] == settings and all((resources_dir / p["path"]).is_file() for p in stamp["parts"]):
+            return stamp["parts"], stamp["pageCount"], False
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+    doc = fitz.open(source)
+    try:
+        if not doc.page_count:
+            raise RuntimeError("the PDF has no pages")
+        parts = []
+        ranges = part_ranges(doc, pages_per_part, by)
+        width = max(3, len(str(len(ranges))))
+        for n, (first, last, title) in enumerate(ranges, 1):
+            path = out_dir / f"part-{n:0{width}d}.pdf"
+            write_part(doc, first, last, path)
+            entry = {"path": path.relative_to(resources_dir).as_posix(), "firstPage": first + 1,
+                     "lastPage": last + 1, "size": path.stat().st_size}
+            if title:
+                entry["title"] = title
+            parts.append(entry)
+        page_count = doc.page_count
+    finally:
+        doc.close()
+    write_atomic(stamp_path, dump_pretty({"settings": settings, "pageCount": page_count, "parts": parts})
+                 .encode('utf-8'))
+    return parts, page_count, True
+
+
+def set_page_index(book, parts, page_count, was_split):
+    """Store the index on a library.json book.
+
+    Part paths fingerprint-resources.py already hashed are kept unless the
+    book was split again, since new parts may reuse the old names.
+    """
+    hashed = {} if was_split else {logical_path(p["path"]): p["path"] for p in book.get("parts", [])}
+    book["pageCount"] = page_count
+    book["parts"] = [{**p, "path": hashed.get(p["path"], p["path"])} for p in parts]
+
+
+def print_report(results):
+    print(f"\n{'Book':<28} {'pages':>6} {'parts':>5} {'book MB':>8} {'parts MB':>9} "
+          f"{'min':>7} {'median':>7} {'max':>7}")
+    for book_id, book_size, page_count, parts in results:
+        sizes = [p["size"] for p in parts]
+        mb = 1024 * 1024
+        print(f"{book_id:<28} {page_count:>6} {len(parts):>5} {book_size / mb:>8.1f} {sum(sizes) / mb:>9.1f} "
+              f"{min(sizes) / mb:>7.1f} {statistics.median(sizes) / mb:>7.1f} {max(sizes) / mb:>7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split large library PDFs into parts with a page index.")
+    parser.add_argument('--resources', type=Path, default=RESOURCES_DIR,
+                        help=f"staged resources (default: {RESOURCES_DIR})")
+    parser.add_argument('--library', type=Path, default=LIBRARY_FILE, help=f"library catalog (default: {LIBRARY_FILE})")
+    parser.add_argument('--min-size-mb', type=float, default=100,
+                        help="split books at least this large, besides sizeWarning ones (default: 100)")
+    parser.add_argument('--pages-per-part', type=int, default=40, help="most pages in one part (default: 40)")
+    parser.add_argument('--by', choices=("auto", "chapters", "pages"), default="auto",
+                        help="auto splits by chapter when the book has an outline (default: auto)")
+    args = parser.parse_args()
+    if args.pages_per_part < 1:
+        parser.error("--pages-per-part must be at least 1")
+
+    start = time.perf_counter()
+    with open(args.library, 'r', encoding='utf-8') as f:
+        library = json.load(f)
+
+    indexes = {}  # book id -> (parts, page count, was split), or None to drop a stale index
+    results = []
+    failed = []
+    n_split = 0
+    for category in library.get("categories", []):
+        for book in category.get("books", []):
+            book_path = logical_path(book["path"])
+            source = args.resources / book_path
+            if not source.is_file():
+                print(f"  WARNING: not staged: {source}")
+                continue
+            size = source.stat().st_size
+            if size < args.min_size_mb * 1024 * 1024 and not book.get("sizeWarning"):
+                if "parts" in book or (args.resources / parts_dir(book_path)).exists():
+                    shutil.rmtree(args.resources / parts_dir(book_path), ignore_errors=True)
+                    indexes[book["id"]] = None
+                continue
+            try:
+                parts, page_count, was_split = split_book(source, book_path, args.resources,
+                                                          args.pages_per_part, args.by)
+            except RuntimeError as e:  # PyMuPDF's errors for damaged or non-PDF files
+                shutil.rmtree(args.resources / parts_dir(book_path), ignore_errors=True)
+                failed.append((source, e))
+                indexes[book["id"]] = None
+                continue
+            n_split += was_split
+            indexes[book["id"]] = (parts, page_count, was_split)
+            results.append((book["id"], size, page_count, parts))
+
+    def update(catalog):
+        for category in catalog.get("categories", []):
+            for book in category.get("books", []):
+                if book["id"] not in indexes:
+                    continue
+                if indexes[book["id"]] is None:
+                    for key in ("pageCount", "parts"):
+                        book.pop(key, None)
+                else:
+                    set_page_index(book, *indexes[book["id"]])
+
+    update_catalog(update, args.library)
+    if results:
+        print_report(results)
+    print(f"\n{len(results)} books in parts ({n_split} split now, {len(results) - n_split} unchanged); "
+          f"index in {args.library} ({time.perf_counter() - start:.2f}s)")
+    # A book that cannot be split stays whole; the rest of the pipeline still runs
+    for source, error in failed:
+        print(f"  WARNING: left unsplit: {source}: {error}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
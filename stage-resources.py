@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Stage the vendor Learn_Mandarin bundle into resources/ without copying bytes.
+
+Places every file resource_layout.plan_resources() lists at its normalized
+path under resources/, trying in order:
+  1. a hardlink (same filesystem: no data written, no extra disk)
+  2. a reflink via the FICLONE ioctl (btrfs, XFS: copy-on-write clone)
+  3. a copy with os.copy_file_range, which stays in the kernel
+Files are placed from a thread pool, through a temp name and a rename, and
+copies get the source's mtime. A file whose size and mtime already match
+its source is left alone, and files no longer in the plan are removed
+(except the <book>.parts/ of a staged book, see split-library-pdfs.py), so
+restaging an unchanged bundle only stats each file once.
+
+A hardlinked file shares its inode with the vendor copy: editing one in
+place edits both. Use --mode copy to stage independent copies.
+
+Usage:
+  python3 stage-resources.py [--vendor /home/cmantra/Learn_Mandarin] [--dest resources]
+  python3 stage-resources.py --mode copy --jobs 8
+  python3 stage-resources.py --dry-run
+"""
+
+import argparse
+import errno
+import fcntl
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from resource_layout import VENDOR_DIR, parts_dir, plan_resources
+
+DEST_DIR = Path("resources")
+FICLONE = 0x40049409  # _IOW(0x94, 9, int) from linux/fs.h
+COPY_CHUNK = 64 * 1024 * 1024
+MODES = ("auto", "link", "reflink", "copy")
+# errnos that mean "this filesystem / pair of files can't do that", not a real failure
+UNSUPPORTED = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS, errno.EMLINK}
+# link(2) also gives EPERM when fs.protected_hardlinks refuses a file we do not own;
+# anywhere else EPERM is a real permission problem and is reported
+LINK_UNSUPPORTED = UNSUPPORTED | {errno.EPERM}
+
+
+def up_to_date(source_stat, dest):
+    try:
+        dest_stat = dest.stat()
+    except FileNotFoundError:
+        return False
+    if (dest_stat.st_dev, dest_stat.st_ino) == (source_stat.st_dev, source_stat.st_ino):
+        return True
+    return dest_stat.st_size == source_stat.st_size and dest_stat.st_mtime_ns == source_stat.st_mtime_ns
+
+
+def reflink(source, tmp_path):
+    with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def copy_range(source, tmp_path, size):
+    with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+        copied = 0
+        while copied < size:
+            try:
+                n = os.copy_file_range(src.fileno(), dst.fileno(), min(COPY_CHUNK, size - copied))
+            except OSError as e:
+                if e.errno not in UNSUPPORTED:
+                    raise
+                # Kernel or filesystem can't: finish in user space from the current offsets
+                shutil.copyfileobj(src, dst, COPY_CHUNK)
+                break
+            if n == 0:  # source shrank under us
+                break
+            copied += n
+
+
+def place(source, dest, source_stat, mode):
+    """Put source at dest; returns how: 'link', 'reflink' or 'copy'."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        if mode in ("auto", "link"):
+            try:
+                os.link(source, tmp_path)
+                os.replace(tmp_path, dest)
+                return "link"
+            except OSError as e:
+                if mode == "link" or e.errno not in LINK_UNSUPPORTED:
+                    raise
+        method = "copy"
+        if mode in ("auto", "reflink"):
+            try:
+                reflink(source, tmp_path)
+                method = "reflink"
+            except OSError as e:
+                if mode == "reflink" or e.errno not in UNSUPPORTED:
+                    raise
+        if method == "copy":
+            copy_range(source, tmp_path, source_stat.st_size)
+        os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp_path, dest)
+        return method
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def stage_file(source, dest, mode, dry_run):
+    """(outcome, bytes) for one file; outcome is 'unchanged' or how it was placed."""
+    source_stat = source.stat()
+    if up_to_date(source_stat, dest):
+        return "unchanged", 0
+    if dry_run:
+        return "stale", source_stat.st_size
+    method = place(source, dest, source_stat, mode)
+    return method, source_stat.st_size if method == "copy" else 0
+
+
+def remove_stale(dest_dir, wanted, dry_run, keep_dirs=()):
+    """Delete files under dest_dir that are not in wanted (relative paths) or below keep_dirs; returns them."""
+    keep_prefixes = tuple(f"{d}/" for d in keep_dirs)
+    removed = []
+    if not dest_dir.is_dir():
+        return removed
+    for root, dirs, files in os.walk(dest_dir, topdown=False):
+        for name in files:
+            path = Path(root, name)
+            rel = path.relative_to(dest_dir).as_posix()
+            if rel not in wanted and not rel.startswith(keep_prefixes):
+                removed.append(path)
+                if not dry_run:
+                    path.unlink()
+        if not dry_run and root != str(dest_dir) and not os.listdir(root):
+            os.rmdir(root)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage the vendor bundle into resources/ with links or fast copies.")
+    parser.add_argument('--vendor', type=Path, default=VENDOR_DIR, help=f"vendor bundle (default: {VENDOR_DIR})")
+    parser.add_argument('--dest', type=Path, default=DEST_DIR, help=f"staging directory (default: {DEST_DIR})")
+    parser.add_argument('--mode', choices=MODES, default="auto",
+                        help="auto tries link, then reflink, then copy (default: auto)")
+    parser.add_argument('--jobs', type=int, default=min(8, os.cpu_count() or 1), help="parallel file operations")
+    parser.add_argument('--dry-run', action='store_true', help="report what would change, touch nothing")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    plan = plan_resources(args.vendor)
+    if not plan.files:
+        print(f"ERROR: nothing found in {args.vendor}")
+        return 1
+    # Later entries win when two vendor files share a path, as they did with cp
+    targets = {resource.path: resource.source for resource in plan.files}
+
+    counts = {}
+    copied_bytes = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {path: pool.submit(stage_file, source, args.dest / path, args.mode, args.dry_run)
+                   for path, source in targets.items()}
+        for path, future in futures.items():
+            try:
+                outcome, size = future.result()
+            except OSError as e:
+                failed.append((path, e))
+                continue
+            counts[outcome] = counts.get(outcome, 0) + 1
+            copied_bytes += size
+    # A staged book's parts (split-library-pdfs.py) live as long as the book does
+    removed = remove_stale(args.dest, set(targets), args.dry_run, [parts_dir(path) for path in targets])
+
+    for missing in plan.missing:
+        print(f"  WARNING: Not found: {missing}")
+    for path, error in failed:
+        print(f"  ERROR: {path}: {error}")
+    summary = ', '.join(f"{n} {outcome}" for outcome, n in sorted(counts.items()))
+    verb = "would remove" if args.dry_run else "removed"
+    print(f"{len(targets)} files in {args.dest}: {summary}; {len(removed)} {verb}")
+    print(f"Bytes {'to stage' if args.dry_run else 'copied'}: {copied_bytes:,} "
+          f"({time.perf_counter() - start:.2f}s, {args.mode} mode)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
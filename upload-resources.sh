@@ -1,7 +1,15 @@
 #!/bin/bash
 # upload-resources.sh
 # Uploads sanitized resources to the DigitalOcean server.
-# Run sanitize-resources.sh first to create the ./resources/ directory.
+# Run sanitize-resources.sh first to create the ./resources-dist/ directory, whose
+# file names carry a content hash (fingerprint-resources.py), so the immutable
+# caching below never serves a stale file.
+#
+# Only files added or changed since the last successful upload are sent
+# (plan-upload.py keeps their hashes in .cache/upload-state.json). Files the new
+# catalogs no longer use stay on the server, since clients holding an older
+# catalog may still request them. Delete .cache/upload-state.json to force a
+# full upload.
 #
 # Usage: ./upload-resources.sh
 
@@ -10,10 +18,14 @@ set -euo pipefail
 SSH_KEY="$HOME/.ssh/famlingo-digitalocean"
 REMOTE="root@134.209.102.164"
 REMOTE_PATH="/var/www/famlingo-resources/"
-LOCAL_PATH="/home/cmantra/famlingo/resources/"
+LOCAL_PATH="/home/cmantra/famlingo/resources-dist/"
+REPO="/home/cmantra/famlingo"
+SEND_LIST=$(mktemp)
+SNAPSHOT=$(mktemp)
+trap 'rm -f "$SEND_LIST" "$SNAPSHOT"' EXIT
 
 if [ ! -d "$LOCAL_PATH" ]; then
-  echo "ERROR: ./resources/ directory not found."
+  echo "ERROR: ./resources-dist/ directory not found."
   echo "Run ./sanitize-resources.sh first."
   exit 1
 fi
@@ -23,10 +35,15 @@ echo "Local:  $LOCAL_PATH"
 echo "Remote: $REMOTE:$REMOTE_PATH"
 echo ""
 
-LOCAL_SIZE=$(du -sh "$LOCAL_PATH" | cut -f1)
-echo "Total size to upload: $LOCAL_SIZE"
+cd "$REPO"
+python3 plan-upload.py --local "$LOCAL_PATH" --files-from "$SEND_LIST" --snapshot "$SNAPSHOT"
 echo ""
 
+if [ ! -s "$SEND_LIST" ]; then
+  echo "Server is up to date, nothing to upload."
+  exit 0
+fi
+
 read -p "Continue? (y/n) " -n 1 -r
 echo
 if [[ ! $REPLY =~ ^[Yy]$ ]]; then
@@ -38,12 +55,14 @@ fi
 echo "Creating remote directories..."
 ssh -i "$SSH_KEY" "$REMOTE" "mkdir -p $REMOTE_PATH"
 
-# rsync with progress
-echo "Uploading resources (this may take a while)..."
+# rsync only the planned files, then record the tree they were planned from as uploaded
+echo "Uploading $(wc -l < "$SEND_LIST") files..."
 rsync -avz --progress \
+  --files-from="$SEND_LIST" \
   -e "ssh -i $SSH_KEY" \
   "$LOCAL_PATH" \
   "$REMOTE:$REMOTE_PATH"
+python3 plan-upload.py --commit --snapshot "$SNAPSHOT"
 
 echo ""
 echo "=== Upload Complete ==="
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Validate the generated card files against each other and courses.json.
+
+Reads every card file once, a lesson at a time, building an index of card
+IDs and lesson IDs as it goes, and reports every violation with its location
+(file: lesson type[index]):
+
+  errors (exit 1)
+    - a lesson or card that is not the expected JSON shape
+    - a card missing id, cn, pinyin or en, or with a non-string value
+    - a card ID that does not belong to its lesson and card type
+      (L1-001 vocab -> L1-001-V01, SN-02 -> SN-02-V07, SN-VG06 -> VG06-S03)
+    - a card ID used twice, in the same file or across files
+    - a lesson ID defined in more than one card file (the app merges the
+      files into one object, so the later file would silently win)
+  warnings (exit 1 only with --strict)
+    - a card whose cn, pinyin or en is empty
+    - a lesson with cards but no entry in courses.json, so the app never
+      shows it, and a courses.json lesson with no cards
+
+Usage:
+  python3 validate-cards.py                       # the three src/data card files
+  python3 validate-cards.py public/cards other.json --courses src/data/courses.json
+  python3 validate-cards.py --strict --limit 0    # fail on warnings too, list everything
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from card_output import CARD_FILES, CARD_TYPES, ID_LETTERS, iter_lessons
+
+COURSES_FILE = Path("src/data/courses.json")
+REQUIRED_FIELDS = ("id", "cn", "pinyin", "en")
+OPTIONAL_FIELDS = ("pos",)
+CARD_NUMBER_RE = re.compile(r"\d{2,}")
+
+
+class Report:
+    """Violations grouped by check, in the order they were found."""
+
+    def __init__(self):
+        self.errors = {}
+        self.warnings = {}
+
+    def error(self, check, location, message):
+        self.errors.setdefault(check, []).append((location, message))
+
+    def warning(self, check, location, message):
+        self.warnings.setdefault(check, []).append((location, message))
+
+
+def id_prefixes(lesson_id):
+    """Card ID prefixes a lesson's cards may use: its own ID, or VG06 for SN-VG06."""
+    prefixes = [lesson_id]
+    if lesson_id.startswith("SN-VG"):
+        prefixes.append(lesson_id[len("SN-"):])
+    return prefixes
+
+
+def check_card_id(card_id, lesson_id, card_type):
+    """True if card_id is <prefix>-<letter><number> for this lesson and card type."""
+    for prefix in id_prefixes(lesson_id):
+        head = f"{prefix}-{ID_LETTERS[card_type]}"
+        if card_id.startswith(head) and CARD_NUMBER_RE.fullmatch(card_id, len(head)):
+            return True
+    return False
+
+
+def validate_cards(card_files, courses, report):
+    """Check every card file in one pass; returns (lesson count, card count).
+
+    card_files holds (name, path) pairs. Each file is read with
+    card_output.iter_lessons(), so only one lesson is parsed at a time.
+    """
+    card_ids = {}    # card_id -> location of first use
+    lesson_ids = {}  # lesson_id -> file that defines it
+    n_cards = 0
+
+    for name, path in card_files:
+        try:
+            for lesson_id, lesson in iter_lessons(path):
+                n_cards += check_lesson(name, lesson_id, lesson, lesson_ids, card_ids, report)
+        except (OSError, ValueError) as e:
+            report.error("unreadable", name, str(e))
+
+    for lesson_id, name in lesson_ids.items():
+        if courses is not None and lesson_id not in courses:
+            report.warning("not in courses.json", f"{name}: {lesson_id}", "lesson has cards but no course entry")
+    if courses is not None:
+        for lesson_id, level_id in courses.items():
+            if lesson_id not in lesson_ids:
+                report.warning("no cards", f"courses.json: {level_id} {lesson_id}", "lesson has no cards")
+
+    return len(lesson_ids), n_cards
+
+
+def check_lesson(name, lesson_id, lesson, lesson_ids, card_ids, report):
+    """Check one lesson and its cards; returns how many cards it has."""
+    where = f"{name}: {lesson_id}"
+    if lesson_id in lesson_ids:
+        report.error("duplicate lesson", where, f"also defined in {lesson_ids[lesson_id]}")
+    else:
+        lesson_ids[lesson_id] = name
+    if not isinstance(lesson, dict):
+        report.error("shape", where, "lesson is not an object")
+        return 0
+    if not isinstance(lesson.get("lessonTitle"), str):
+        report.error("shape", where, "missing or non-string lessonTitle")
+    for key in lesson:
+        if key != "lessonTitle" and key not in CARD_TYPES:
+            report.error("shape", where, f"unknown key {key!r}")
+
+    n_cards = 0
+    for card_type in CARD_TYPES:
+        type_cards = lesson.get(card_type, [])
+        if not isinstance(type_cards, list):
+            report.error("shape", f"{where} {card_type}", "not a list")
+            continue
+        for i, card in enumerate(type_cards):
+            location = f"{where} {card_type}[{i}]"
+            n_cards += 1
+            if not isinstance(card, dict):
+                report.error("shape", location, "card is not an object")
+                continue
+            check_card(card, location, lesson_id, card_type, card_ids, report)
+    return n_cards
+
+
+def check_card(card, location, lesson_id, card_type, card_ids, report):
+    for field in REQUIRED_FIELDS:
+        if field not in card:
+            report.error("missing field", location, f"no {field!r}")
+        elif not isinstance(card[field], str):
+            report.error("missing field", location, f"{field!r} is {type(card[field]).__name__}, not a string")
+        elif field != "id" and not card[field].strip():
+            report.warning("empty field", location, f"empty {field!r}")
+    for field in card:
+        if field not in REQUIRED_FIELDS and field not in OPTIONAL_FIELDS:
+            report.error("shape", location, f"unknown field {field!r}")
+        elif field in OPTIONAL_FIELDS and not isinstance(card[field], str):
+            report.error("missing field", location, f"{field!r} is not a string")
+
+    card_id = card.get("id")
+    if not isinstance(card_id, str):
+        return
+    if not check_card_id(card_id, lesson_id, card_type):
+        expected = f"{id_prefixes(lesson_id)[-1]}-{ID_LETTERS[card_type]}NN"
+        report.error("bad id", location, f"{card_id!r} does not match {expected}")
+    if card_id in card_ids:
+        report.error("duplicate id", location, f"{card_id!r} already used at {card_ids[card_id]}")
+    else:
+        card_ids[card_id] = location
+
+
+def load_course_lessons(path):
+    """{lesson_id: level_id} for every lesson listed in courses.json."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {lesson["id"]: level["id"] for level in data.get("levels", []) for lesson in level.get("lessons", [])}
+
+
+def print_violations(label, groups, limit):
+    for check, violations in groups.items():
+        print(f"\n{label} {check} ({len(violations)})")
+        shown = violations if not limit else violations[:limit]
+        for location, message in shown:
+            print(f"  {location}: {message}")
+        if len(shown) < len(violations):
+            print(f"  ... and {len(violations) - len(shown)} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check card files for schema errors, duplicate IDs "
+                                                 "and lessons missing from courses.json.")
+    parser.add_argument('inputs', nargs='*', type=Path, default=CARD_FILES,
+                        help="card files or shard directories (default: the three src/data card files)")
+    parser.add_argument('--courses', type=Path, default=COURSES_FILE,
+                        help=f"course catalog to cross-check (default: {COURSES_FILE})")
+    parser.add_argument('--no-courses', action='store_true', help="skip the courses.json cross-check")
+    parser.add_argument('--strict', action='store_true', help="exit 1 on warnings as well as errors")
+    parser.add_argument('--limit', type=int, default=20,
+                        help="violations listed per check, 0 for all (default: 20)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = Report()
+    courses = None
+    if not args.no_courses:
+        try:
+            courses = load_course_lessons(args.courses)
+        except (OSError, ValueError, KeyError) as e:
+            report.error("unreadable", str(args.courses), f"{e} (use --no-courses to skip the cross-check)")
+    card_files = [(str(path), path) for path in args.inputs]
+    n_lessons, n_cards = validate_cards(card_files, courses, report)
+    elapsed = time.perf_counter() - start
+
+    print_violations("ERROR", report.errors, args.limit)
+    print_violations("WARNING", report.warnings, args.limit)
+    n_errors = sum(len(v) for v in report.errors.values())
+    n_warnings = sum(len(v) for v in report.warnings.values())
+    print(f"\n{n_cards} cards in {n_lessons} lessons from {len(card_files)} files: "
+          f"{n_errors} errors, {n_warnings} warnings ({elapsed * 1000:.0f}ms)")
+    return 1 if n_errors or (args.strict and n_warnings) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())